@@ -1,8 +1,18 @@
+from startup_profile import page_profile
+profile = page_profile("ai_8")
+
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import google.generativeai as genai
+
+from dataset_store import SAVE_FAILED_MESSAGE, get_store, remember_upload
+from ingestion import (
+    CLOTHING_SCHEMA, STREAMING_THRESHOLD_BYTES, iter_csv_chunks, load_upload, read_preview,
+    upload_digest, upload_report,
+)
+from kpi import CLOTHING_KPI_COLUMNS, compute_kpis, compute_kpis_chunked, performance_summary
+from llm_cache import gemini_stream
+from user_tokens import user_from_token
+
+profile.mark("imports")
 
 google_api_key = st.secrets["api_keys"]["google_api"]
 
@@ -10,25 +20,45 @@ st.set_page_config(page_title="AI-Powered Clothing Sales Analysis", layout="wide
 st.title("🧠 AI-Powered Clothing Sales Analysis")
 
 uploaded_file = st.file_uploader("Upload your clothing sales CSV file", type="csv")
+profile.finish("first render")
+user_id = user_from_token(st.query_params.get("token"))
+saved = get_store().info(user_id, CLOTHING_SCHEMA.name) if user_id is not None else None
 
-if uploaded_file:
+if uploaded_file or saved:
     try:
-        df = pd.read_csv(uploaded_file, parse_dates=['Date'])
-        df['Revenue'] = df['Quantity'] * df['Price']
-        df['Month'] = df['Date'].dt.to_period("M").astype(str)
+        memory = None
+        if not uploaded_file:
+            st.caption(f"Using your saved dataset ({saved['row_count']:,} rows). Upload a file to replace it.")
+            chunks = get_store().iter_frames(user_id, CLOTHING_SCHEMA.name, columns=CLOTHING_KPI_COLUMNS.values())
+            kpis = compute_kpis_chunked(chunks, CLOTHING_KPI_COLUMNS, cache_key=saved['digest'])
+            preview = get_store().head(user_id, CLOTHING_SCHEMA.name)
+        elif st.sidebar.checkbox("Streaming mode (large files)", value=uploaded_file.size > STREAMING_THRESHOLD_BYTES):
+            chunks = iter_csv_chunks(uploaded_file, CLOTHING_SCHEMA, usecols=CLOTHING_KPI_COLUMNS.values())
+            kpis = compute_kpis_chunked(chunks, CLOTHING_KPI_COLUMNS, cache_key=upload_digest(uploaded_file))
+            preview = read_preview(uploaded_file, CLOTHING_SCHEMA)
+            if not remember_upload(user_id, uploaded_file, CLOTHING_SCHEMA, streaming=True):
+                st.warning(SAVE_FAILED_MESSAGE)
+        else:
+            df = load_upload(uploaded_file, CLOTHING_SCHEMA)
+            memory = upload_report(uploaded_file, CLOTHING_SCHEMA)
+            kpis = compute_kpis(df, CLOTHING_KPI_COLUMNS, cache_key=upload_digest(uploaded_file))
+            preview = df.head()
+            if not remember_upload(user_id, uploaded_file, CLOTHING_SCHEMA):
+                st.warning(SAVE_FAILED_MESSAGE)
 
         with st.expander("🔍 Preview Data"):
-            st.dataframe(df.head())
+            st.dataframe(preview)
+            if memory:
+                st.caption(f"Loaded compactly: {memory}")
 
         st.subheader("📈 Summary Metrics")
         col1, col2, col3 = st.columns(3)
-        col1.metric("Total Revenue", f"₹{df['Revenue'].sum():,.0f}")
-        col2.metric("Total Units Sold", f"{df['Quantity'].sum():,.0f}")
-        col3.metric("Average Rating", f"{df['Review Rating (out of 5)'].mean():.2f} ⭐")
+        col1.metric("Total Revenue", f"₹{kpis['total_revenue']:,.0f}")
+        col2.metric("Total Units Sold", f"{kpis['total_units']:,.0f}")
+        col3.metric("Average Rating", f"{kpis['avg_rating']:.2f} ⭐")
 
         st.subheader("🏆 Top 10 Products by Revenue")
-        top_products = df.groupby('Product')['Revenue'].sum().sort_values(ascending=False).head(10)
-        st.bar_chart(top_products)
+        st.bar_chart(kpis['top_products'])
         '''st.subheader("💳 Payment Method Distribution")
         payment_counts = df['Payment Method'].value_counts()
         st.bar_chart(payment_counts)
@@ -61,28 +91,18 @@ if uploaded_file:
         Be practical, supportive, and a little creative. Imagine you're advising a real clothing store owner who wants real results.
 
         Performance Summary:
-        - Total Revenue: ₹{df['Revenue'].sum():,.0f}
-        - Total Units Sold: {df['Quantity'].sum():,.0f}
-        - Average Review Rating: {df['Review Rating (out of 5)'].mean():.2f}
-        - Top 3 Products: {', '.join(top_products.index[:3])}
-        - Most Used Payment Method: {payment_counts.idxmax()}
-        - Most Profitable Segment: {seg_rev.idxmax()} with ₹{seg_rev.max():,.0f}
-        - Gender with Highest Revenue: {gender_rev.idxmax()} with ₹{gender_rev.max():,.0f}
-        - Revenue from Discounts: ₹{discount_rev.get(True, 0):,.0f}
-        - Revenue without Discounts: ₹{discount_rev.get(False, 0):,.0f}
-        - Best Performing Age Group: {age_rev.idxmax()} with ₹{age_rev.max():,.0f}
-        - Avg Monthly Revenue: ₹{df.groupby('Month')['Revenue'].sum().mean():,.0f}
+        {performance_summary(kpis)}
 
         Daily Revenue Breakdown:
-        {weekday_rev.to_string()}
+        {kpis['weekday_revenue'].to_string()}
         """
 
+        import google.generativeai as genai
+
         model = genai.GenerativeModel('gemini-2.0-flash-thinking-exp')
-        with st.spinner("Getting AI-generated suggestions..."):
-            response = model.generate_content(summary_text)
-            st.success("Here's what the AI recommends:")
-            st.markdown(response.text)
-            st.download_button("💾 Download Suggestions", response.text, file_name="Clothing_AI_Insights.txt")
+        st.success("Here's what the AI recommends:")
+        response_text = st.write_stream(gemini_stream(model, summary_text))
+        st.download_button("💾 Download Suggestions", response_text, file_name="Clothing_AI_Insights.txt")
 
     except Exception as e:
         st.error(f"⚠ An error occurred while processing the file: {e}")
@@ -1,9 +1,16 @@
+from startup_profile import page_profile
+profile = page_profile("ai_marketing_assistant")
+
 import streamlit as st
-import requests
 import json
-import os
-from datetime import date
-import google.generativeai as genai
+import threading
+from functools import partial
+
+from llm_cache import cached_generate, gemini_generate
+from llm_orchestration import run_llm_calls
+from together_client import TogetherAPIError, get_together_client
+
+profile.mark("imports")
 
 st.set_page_config(page_title="AI Marketing Assistant", layout="wide")
 
@@ -26,8 +33,11 @@ user_profile = {
 
 st.title("🧠 AI-Powered Marketing Assistant")
 st.write(f"👋 Hello {user_profile['name']}, here's your personalized marketing strategy for your *{user_profile['business_type']}* business!")
+profile.finish("first render")
+
+def generate_marketing_templates(profile, bypass_cache=False):
+    import google.generativeai as genai
 
-def generate_marketing_templates(profile):
     genai.configure(api_key=GEMINI_API_KEY)
     model = genai.GenerativeModel("gemini-2.0-flash-thinking-exp")
 
@@ -50,8 +60,7 @@ Make sure to consider income and location in your suggestions.
 """
 
     try:
-        response = model.generate_content(prompt)
-        content = response.text.strip()
+        content = gemini_generate(model, prompt, bypass=bypass_cache).strip()
 
         content = content.split("```json")[-1].split("```")[0].strip() if "```" in content else content
 
@@ -73,7 +82,7 @@ if "template_data" not in st.session_state:
     st.session_state.template_data = generate_marketing_templates(user_profile)
 
 if st.button("🔁 Refresh Suggestions"):
-    st.session_state.template_data = generate_marketing_templates(user_profile)
+    st.session_state.template_data = generate_marketing_templates(user_profile, bypass_cache=True)
 
 template_data = st.session_state.template_data
 
@@ -107,36 +116,35 @@ Each day should include: Post Idea, Caption, Hashtags.
 Format as markdown table.
 """
 
-    headers = {
-        "Authorization": f"Bearer {TOGETHER_API_KEY}",
-        "Content-Type": "application/json"
-    }
+    model = "mistralai/Mixtral-8x7B-Instruct-v0.1"
+    temperature = 0.7
+    messages = [
+        {"role": "system", "content": "You are an expert content strategist."},
+        {"role": "user", "content": user_prompt}
+    ]
 
-    payload = {
-        "model": "mistralai/Mixtral-8x7B-Instruct-v0.1",
-        "messages": [
-            {"role": "system", "content": "You are an expert content strategist."},
-            {"role": "user", "content": user_prompt}
-        ],
-        "temperature": 0.7,
-        "max_tokens": 10000
-    }
+    def request_calendar():
+        client = get_together_client(TOGETHER_API_KEY)
+        return client.chat(model, messages, temperature=temperature, max_tokens=10000)
 
-    response = requests.post("https://api.together.xyz/v1/chat/completions", headers=headers, json=payload)
-    return response.json()["choices"][0]["message"]["content"]
+    return cached_generate("together", model, user_prompt, request_calendar, temperature=temperature)
 
 if st.button("📅 Generate 15-Day Content Calendar"):
     with st.spinner("Crafting your content plan..."):
-        calendar = generate_content_calendar(user_profile, template_data)
-        st.subheader("📆 Your Social Media Calendar")
-        st.markdown(calendar)
+        try:
+            calendar = generate_content_calendar(user_profile, template_data)
+            st.subheader("📆 Your Social Media Calendar")
+            st.markdown(calendar)
+        except TogetherAPIError as e:
+            st.error(f"⚠️ Failed to generate the content calendar: {e}")
 
 def generate_email(subject, tone, product):
+    import google.generativeai as genai
+
     genai.configure(api_key=GEMINI_API_KEY)
     model = genai.GenerativeModel("gemini-2.0-flash-thinking-exp")
     prompt = f"Write a promotional email for {product}. Subject: {subject}. Tone: {tone}. Audience: returning customers."
-    response = model.generate_content(prompt)
-    return response.text
+    return gemini_generate(model, prompt)
 
 with st.expander("✉ Generate Email Campaign"):
     email_subject = st.text_input("Subject")
@@ -145,3 +153,37 @@ with st.expander("✉ Generate Email Campaign"):
     if st.button("Generate Email"):
         email_text = generate_email(email_subject, email_tone, email_product)
         st.text_area("Generated Email", email_text, height=300)
+
+with st.expander("⚡ Generate Calendar and Email Variants Together"):
+    bundle_subject = st.text_input("Email Subject", key="bundle_subject")
+    bundle_product = st.text_input("Product to Highlight", key="bundle_product")
+    bundle_tones = st.multiselect("Email Tones", ["Friendly", "Exciting", "Elegant", "Professional"], default=["Friendly", "Exciting"])
+    if st.button("Generate All"):
+        calls = {"calendar": partial(generate_content_calendar, user_profile, template_data)}
+        for tone in bundle_tones:
+            calls[tone] = partial(generate_email, bundle_subject, tone, bundle_product)
+
+        # A rerun interrupts the previous wait; setting its event keeps that
+        # run's queued calls from taking executor slots from this one.
+        previous_run = st.session_state.get("llm_cancel_event")
+        if previous_run is not None:
+            previous_run.set()
+        cancel_event = st.session_state.llm_cancel_event = threading.Event()
+
+        progress = st.empty()
+        results = run_llm_calls(
+            calls,
+            cancel_event=cancel_event,
+            on_progress=lambda done, total: progress.caption(f"⏳ {done}/{total} ready"),
+        )
+        progress.empty()
+
+        for name, result in results.items():
+            title = "📆 Your Social Media Calendar" if name == "calendar" else f"✉ {name} Email"
+            st.subheader(title)
+            if isinstance(result, Exception):
+                st.error(f"⚠️ Generation failed: {result}")
+            elif name == "calendar":
+                st.markdown(result)
+            else:
+                st.text_area(f"{name} Email", result, height=300)
@@ -1,24 +1,41 @@
-import sqlite3
+import os
 from flask import Flask, render_template, request, redirect, url_for, g, session
-from werkzeug.security import generate_password_hash, check_password_hash
+
+from assets import init_assets
+from database import get_pool, migrate
+from password_hashing import HashingBusy, PasswordHasher
+from user_tokens import SECRET_KEY, user_token
+
+if not SECRET_KEY:
+    # A guessable default would let anyone sign sessions and page tokens for any user id.
+    raise RuntimeError('SECRET_KEY is not set; export a long random value before starting the app.')
 
 app = Flask(__name__)
-app.secret_key = 'your_secret_key'
+app.secret_key = SECRET_KEY
+init_assets(app)
+
+DATABASE = os.environ.get('DATABASE', 'users.db')
+BUSY_MESSAGE = 'The server is busy right now. Please try again in a moment.'
 
-DATABASE = 'users.db'
+hasher = PasswordHasher()
+
+@app.context_processor
+def inject_user_token():
+    """Gives the menu templates a signed token so the Streamlit pages can open the user's saved datasets."""
+    user_id = session.get('user_id')
+    return {'user_token': user_token(user_id) if user_id is not None else ''}
 
 def get_db():
-    """Gets the database connection."""
+    """Borrows a pooled database connection for this request."""
     if 'db' not in g:
-        g.db = sqlite3.connect(DATABASE)
-        g.db.row_factory = sqlite3.Row
+        g.db = get_pool(DATABASE).acquire()
     return g.db
 
 def close_db(e=None):
-    """Closes the database connection."""
+    """Returns the request's database connection to the pool."""
     db = g.pop('db', None)
     if db is not None:
-        db.close()
+        get_pool(DATABASE).release(db)
 
 def init_db():
     """Initializes the database schema."""
@@ -27,7 +44,8 @@ def init_db():
         try:
             with app.open_resource('schema.sql', mode='r') as f:
                 db.cursor().executescript(f.read())
-            db.commit()
+            db.execute('PRAGMA user_version = 0')
+            migrate(db)
         except Exception as e:
             print(f"Error initializing database: {e}")
             db.rollback()
@@ -67,7 +85,10 @@ def register():
 
         if error is None:
             try:
-                hashed_password = generate_password_hash(password)
+                hashed_password = hasher.hash(password)
+            except HashingBusy:
+                return render_template('register.html', registration_error=BUSY_MESSAGE), 503
+            try:
                 user_id = db.execute(
                     'INSERT INTO users (username, password_hash) VALUES (?, ?)',
                     (username, hashed_password)
@@ -119,13 +140,30 @@ def login():
             'SELECT * FROM users WHERE username = ?', (username,)
         ).fetchone()
 
-        if user is None or not check_password_hash(user['password_hash'], password):
+        try:
+            valid = user is not None and hasher.verify(user['password_hash'], password)
+        except HashingBusy:
+            return render_template('login.html', error=BUSY_MESSAGE), 503
+
+        if not valid:
             error = 'Invalid username or password'
         else:
+            if hasher.needs_rehash(user['password_hash']):
+                hasher.rehash_later(password, lambda new_hash, user_id=user['id']: store_password_hash(user_id, new_hash))
             session['user_id'] = user['id']
             return redirect(url_for('options'))
     return render_template('login.html', error=error)
 
+def store_password_hash(user_id, password_hash):
+    """Saves a refreshed password hash outside of any request."""
+    pool = get_pool(DATABASE)
+    db = pool.acquire()
+    try:
+        db.execute('UPDATE users SET password_hash = ? WHERE id = ?', (password_hash, user_id))
+        db.commit()
+    finally:
+        pool.release(db)
+
 @app.route('/options/')
 def options():
     """Renders the menu options page."""
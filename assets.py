@@ -0,0 +1,231 @@
+"""Fingerprinted, precompressed static assets for the Flask app.
+
+`python assets.py` (or `flask build-assets`) copies the images next to
+app.py into static/build under content-hashed names. It also writes WebP
+variants when Pillow is installed, gzip/brotli copies of text assets, and
+a manifest.json. Sources that have not changed since the last build are
+reused. Templates link assets with asset_url(name), and /assets/ serves
+them with immutable cache headers, ETags and Accept/Accept-Encoding
+negotiation.
+
+Importing the app never builds: assets missing from the manifest, or
+whose source changed after the build, are linked unfingerprinted until
+the next build.
+"""
+import glob
+import gzip
+import hashlib
+import io
+import json
+import mimetypes
+import os
+
+from flask import Blueprint, current_app, request, send_from_directory, url_for
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ASSET_SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSET_BUILD_DIR = os.path.join(ASSET_SOURCE_DIR, 'static', 'build')
+ASSET_PATTERNS = ('*.png', '*.jpg', '*.jpeg', '*.gif', '*.svg', '*.css', '*.js')
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+COMPRESSIBLE_EXTENSIONS = ('.svg', '.css', '.js')
+WEBP_QUALITY = 80
+MAX_AGE_SECONDS = 365 * 24 * 3600
+MIN_COMPRESS_BYTES = 1024
+
+assets = Blueprint('assets', __name__)
+_manifest = {}
+_by_file = {}
+
+
+def _write(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def _webp_variants(data, stem, digest, build_dir):
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+        buffer = io.BytesIO()
+        image.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=6)
+    if buffer.tell() >= len(data):
+        return {}
+    filename = f'{stem}.{digest}.webp'
+    _write(os.path.join(build_dir, filename), buffer.getvalue())
+    return {'webp': filename}
+
+
+def _sources(source_dir):
+    return [path for pattern in ASSET_PATTERNS for path in sorted(glob.glob(os.path.join(source_dir, pattern)))]
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _built(entry, build_dir):
+    files = [entry['file'], *entry['variants'].values(), *entry['encodings'].values()]
+    return all(os.path.exists(os.path.join(build_dir, filename)) for filename in files)
+
+
+def _read_manifest(build_dir):
+    path = os.path.join(build_dir, 'manifest.json')
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def build_assets(source_dir=ASSET_SOURCE_DIR, build_dir=ASSET_BUILD_DIR):
+    """Writes fingerprinted copies and variants of every changed asset and returns the manifest.
+
+    A source whose modification time and size, or failing that whose
+    content hash, match the previous build keeps its built files.
+    """
+    os.makedirs(build_dir, exist_ok=True)
+    previous = _read_manifest(build_dir)
+    manifest = {}
+    for path in _sources(source_dir):
+        name = os.path.basename(path)
+        stamp = _stamp(path)
+        entry = previous.get(name.lower())
+        if entry is not None and entry.get('source') == stamp and _built(entry, build_dir):
+            manifest[name.lower()] = entry
+            continue
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        stem, ext = os.path.splitext(name)
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        if entry is not None and entry['etag'] == digest and _built(entry, build_dir):
+            manifest[name.lower()] = {**entry, 'source': stamp}
+            continue
+
+        filename = f'{stem}.{digest}{ext.lower()}'
+        _write(os.path.join(build_dir, filename), data)
+
+        entry = {'file': filename, 'etag': digest, 'source': stamp, 'variants': {}, 'encodings': {}}
+        if ext.lower() in IMAGE_EXTENSIONS and Image is not None:
+            entry['variants'] = _webp_variants(data, stem, digest, build_dir)
+        if ext.lower() in COMPRESSIBLE_EXTENSIONS:
+            _write(os.path.join(build_dir, filename + '.gz'), gzip.compress(data, 9))
+            entry['encodings']['gzip'] = filename + '.gz'
+            if brotli is not None:
+                _write(os.path.join(build_dir, filename + '.br'), brotli.compress(data))
+                entry['encodings']['br'] = filename + '.br'
+        manifest[name.lower()] = entry
+
+    with open(os.path.join(build_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(source_dir=ASSET_SOURCE_DIR, build_dir=ASSET_BUILD_DIR):
+    """Loads the built manifest without building, leaving out assets whose source changed since."""
+    built = _read_manifest(build_dir)
+    manifest = {}
+    for path in _sources(source_dir):
+        name = os.path.basename(path).lower()
+        entry = built.get(name)
+        if entry is not None and entry.get('source') == _stamp(path):
+            manifest[name] = entry
+    return manifest
+
+
+def asset_url(name):
+    """URL of the fingerprinted asset, or the plain static URL when it is not built."""
+    entry = _manifest.get(name.lower())
+    if entry is None:
+        return url_for('static', filename=name)
+    return url_for('assets.serve', filename=entry['file'])
+
+
+@assets.route('/assets/<path:filename>')
+def serve(filename):
+    """Serves a built asset, preferring WebP or a precompressed copy when the client accepts it."""
+    entry = _by_file.get(filename)
+    if entry is None:
+        return 'Not Found', 404
+
+    served, mimetype, encoding, vary = filename, mimetypes.guess_type(filename)[0], None, None
+    if filename == entry['file'] and 'webp' in entry['variants']:
+        vary = 'Accept'
+        if request.accept_mimetypes['image/webp']:
+            served, mimetype = entry['variants']['webp'], 'image/webp'
+    elif entry['encodings']:
+        vary = 'Accept-Encoding'
+        for candidate in ('br', 'gzip'):
+            if candidate in entry['encodings'] and request.accept_encodings[candidate]:
+                served, encoding = entry['encodings'][candidate], candidate
+                break
+
+    response = send_from_directory(
+        current_app.config['ASSET_BUILD_DIR'], served, mimetype=mimetype,
+        conditional=True, etag=f"{entry['etag']}-{os.path.basename(served)}", max_age=MAX_AGE_SECONDS,
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if vary:
+        response.vary.add(vary)
+    return response
+
+
+def compress_html(response):
+    """Gzips rendered HTML pages for clients that accept it."""
+    if (
+        response.mimetype != 'text/html'
+        or response.direct_passthrough
+        or 'Content-Encoding' in response.headers
+        or not request.accept_encodings['gzip']
+    ):
+        return response
+    body = response.get_data()
+    if len(body) < MIN_COMPRESS_BYTES:
+        return response
+    response.set_data(gzip.compress(body, 6))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def init_assets(app, build_dir=ASSET_BUILD_DIR):
+    """Registers the asset route, the asset_url template helper and HTML compression."""
+    app.config.setdefault('ASSET_BUILD_DIR', build_dir)
+    _manifest.clear()
+    _manifest.update(load_manifest(build_dir=app.config['ASSET_BUILD_DIR']))
+    unbuilt = [os.path.basename(path) for path in _sources(ASSET_SOURCE_DIR)
+               if os.path.basename(path).lower() not in _manifest]
+    if unbuilt:
+        app.logger.warning('Static assets not built or changed since the last build, serving them '
+                           'unfingerprinted until `flask build-assets` runs: %s', ', '.join(unbuilt))
+    _by_file.clear()
+    for entry in _manifest.values():
+        _by_file[entry['file']] = entry
+        for variant in entry['variants'].values():
+            _by_file[variant] = {'file': variant, 'etag': entry['etag'], 'variants': {}, 'encodings': {}}
+
+    app.register_blueprint(assets)
+    app.add_template_global(asset_url)
+    app.after_request(compress_html)
+
+    @app.cli.command('build-assets')
+    def build_assets_command():
+        """Builds fingerprinted and precompressed static assets."""
+        build_assets(build_dir=app.config['ASSET_BUILD_DIR'])
+        print('Built static assets.')
+
+
+if __name__ == '__main__':
+    built = build_assets()
+    print(f'Built {len(built)} assets into {ASSET_BUILD_DIR}')
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+HISTOGRAM_BINS = 30
+MAX_OUTLIERS_PER_GROUP = 50
+MAX_LINE_POINTS = 1000
+
+
+def histogram_bins(series, bins=HISTOGRAM_BINS):
+    """Bins a numeric column on the server; returns bin_start/bin_end/count rows."""
+    values = pd.to_numeric(series, errors='coerce').dropna().to_numpy()
+    counts, edges = np.histogram(values, bins=bins)
+    return pd.DataFrame({'bin_start': edges[:-1], 'bin_end': edges[1:], 'count': counts})
+
+
+def box_stats(df, category_col, value_col, max_outliers=MAX_OUTLIERS_PER_GROUP):
+    """Computes quartiles, 1.5 IQR whiskers and outliers per category.
+
+    Returns (stats, outliers). Stats has one row per category. Outliers
+    keeps at most `max_outliers` of the most extreme points per category,
+    so the payload size does not depend on the row count.
+    """
+    data = df[[category_col, value_col]].dropna()
+    data.columns = ['category', 'value']
+    grouped = data.groupby('category', observed=True)['value']
+
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ['q1', 'median', 'q3']
+    iqr = stats['q3'] - stats['q1']
+    low_fence = data['category'].map(stats['q1'] - 1.5 * iqr)
+    high_fence = data['category'].map(stats['q3'] + 1.5 * iqr)
+
+    inside = data[(data['value'] >= low_fence) & (data['value'] <= high_fence)]
+    whiskers = inside.groupby('category', observed=True)['value'].agg(['min', 'max'])
+    stats['whisker_low'] = whiskers['min']
+    stats['whisker_high'] = whiskers['max']
+    stats = stats.reset_index()
+
+    outliers = data[(data['value'] < low_fence) | (data['value'] > high_fence)].copy()
+    outliers['distance'] = (outliers['value'] - outliers['category'].map(grouped.median())).abs()
+    outliers = (
+        outliers.sort_values('distance', ascending=False)
+        .groupby('category', observed=True)
+        .head(max_outliers)
+        .drop(columns='distance')
+    )
+    return stats, outliers
+
+
+def lttb(x, y, threshold=MAX_LINE_POINTS):
+    """Largest-Triangle-Three-Buckets downsampling; returns the indices to keep."""
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+
+    keep = np.empty(threshold, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(area.argmax())
+        keep[i + 1] = previous
+    return keep
+
+
+def downsample_line(df, x_col, y_col, threshold=MAX_LINE_POINTS):
+    """Reduces a line series to at most `threshold` visually significant points."""
+    if len(df) <= threshold:
+        return df
+    x = df[x_col]
+    x_values = x.astype('int64') if pd.api.types.is_datetime64_any_dtype(x) else x
+    return df.iloc[lttb(x_values.to_numpy(), df[y_col].to_numpy(), threshold)]
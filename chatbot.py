@@ -1,17 +1,35 @@
+from startup_profile import page_profile
+profile = page_profile("chatbot")
+
 import streamlit as st
-import google.generativeai as genai
+
+from conversation_memory import ConversationMemory
+from llm_cache import gemini_generate, gemini_stream
+
+profile.mark("imports")
 
 api_key = st.secrets["GOOGLE_API_KEY"]
-genai.configure(api_key=api_key)
 
-model = genai.GenerativeModel(model_name="models/gemini-2.0-flash-thinking-exp")
+CHAT_MODEL = "models/gemini-2.0-flash-thinking-exp"
+SUMMARY_MODEL = "models/gemini-2.0-flash"
+
+MEMORY_TOKEN_BUDGET = 2000
+MEMORY_RECENT_TURNS = 4
+
+def get_model(model_name):
+    """Builds a Gemini model, importing the client library on the first message rather than at page load."""
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(model_name=model_name)
 
-def get_business_advice(user_input, conversation_history):
+def get_business_advice(user_input, conversation_history, memory):
     conversation_history.append(f"You: {user_input}")
-    full_conversation = "\n".join(conversation_history)
-    response = model.generate_content(full_conversation)
-    conversation_history.append(f"Chatbot: {response.text}")
-    return response.text, conversation_history
+    prompt = memory.build_prompt(user_input)
+    st.write("Chatbot:")
+    response_text = st.write_stream(gemini_stream(get_model(CHAT_MODEL), prompt))
+    conversation_history.append(f"Chatbot: {response_text}")
+    memory.add_turn(user_input, response_text)
+    return response_text, conversation_history
 
 def is_business_related(user_input):
     business_keywords = ["business", "marketing", "finance", "strategy", "startup", "management", "growth", "investment", "economy", "sales", "profit", "loss", "strategies", "company", "field"]
@@ -25,21 +43,29 @@ st.markdown("""
 
 if 'conversation_history' not in st.session_state:
     st.session_state.conversation_history = []
+if 'memory' not in st.session_state:
+    st.session_state.memory = ConversationMemory(
+        summarize=lambda prompt: gemini_generate(get_model(SUMMARY_MODEL), prompt),
+        token_budget=MEMORY_TOKEN_BUDGET,
+        recent_turns=MEMORY_RECENT_TURNS,
+    )
 
 user_input = st.text_input("You: ", "")
+profile.finish("first render")
 
 if user_input:
     if user_input.lower() in ["exit", "quit", "bye"]:
         st.write("Goodbye! Feel free to reach out if you need more advice.")
         st.session_state.conversation_history = []  
+        st.session_state.memory.clear()
     elif user_input.lower() == "clear":
         st.session_state.conversation_history = []  
+        st.session_state.memory.clear()
         st.write("Conversation history cleared! Feel free to ask anything.")
     else:
         if is_business_related(user_input):
-            response, updated_history = get_business_advice(user_input, st.session_state.conversation_history)
+            response, updated_history = get_business_advice(user_input, st.session_state.conversation_history, st.session_state.memory)
             st.session_state.conversation_history = updated_history  
-            st.write(f"Chatbot: {response}")
         else:
             st.write("Please ask business-related questions (e.g., marketing, finance, strategy, etc.).")
 
@@ -0,0 +1,77 @@
+DEFAULT_TOKEN_BUDGET = 2000
+DEFAULT_RECENT_TURNS = 4
+CHARS_PER_TOKEN = 4
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a business owner and their advisor chatbot.
+
+Current summary:
+{summary}
+
+Newer exchanges to fold in:
+{turns}
+
+Rewrite the summary so it includes the new exchanges. Keep the owner's business details, goals, constraints and the advice already given. Use at most {max_words} words. Reply with the summary only."""
+
+
+def estimate_tokens(text):
+    """Rough token count; close enough for budgeting without a tokenizer."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _format_turn(turn):
+    user_text, bot_text = turn
+    return f"You: {user_text}\nChatbot: {bot_text}"
+
+
+class ConversationMemory:
+    """Keeps the last few turns verbatim and folds older ones into a running summary.
+
+    `summarize(prompt)` turns a summary-update prompt into text. It is
+    only called when turns are evicted, so each turn is summarized once
+    and the prompt size stays roughly constant however long the chat runs.
+    """
+
+    def __init__(self, summarize, token_budget=DEFAULT_TOKEN_BUDGET, recent_turns=DEFAULT_RECENT_TURNS):
+        self.summarize = summarize
+        self.token_budget = token_budget
+        self.recent_turns = recent_turns
+        self.summary = ""
+        self.turns = []
+
+    def _recent_tokens(self, turns):
+        return sum(estimate_tokens(_format_turn(turn)) for turn in turns)
+
+    def add_turn(self, user_text, bot_text):
+        """Records an exchange, summarizing whatever no longer fits.
+
+        Evicted turns are only dropped once `summarize` returns, so a failed
+        summary call leaves them in the verbatim history.
+        """
+        self.turns.append((user_text, bot_text))
+
+        evicted = 0
+        while len(self.turns) - evicted > self.recent_turns or (
+            len(self.turns) - evicted > 1 and self._recent_tokens(self.turns[evicted:]) > self.token_budget // 2
+        ):
+            evicted += 1
+
+        if evicted:
+            self.summary = self.summarize(SUMMARY_PROMPT.format(
+                summary=self.summary or "(empty)",
+                turns="\n\n".join(_format_turn(turn) for turn in self.turns[:evicted]),
+                max_words=self.token_budget // 3,
+            )).strip()
+            del self.turns[:evicted]
+
+    def build_prompt(self, user_text):
+        """Assembles the summary, the recent turns and the new message."""
+        sections = []
+        if self.summary:
+            sections.append(f"Summary of the earlier conversation:\n{self.summary}")
+        sections.extend(_format_turn(turn) for turn in self.turns)
+        sections.append(f"You: {user_text}")
+        return "\n\n".join(sections)
+
+    def clear(self):
+        self.summary = ""
+        self.turns = []
@@ -1,32 +1,32 @@
+from startup_profile import page_profile
+profile = page_profile("dashboard")
+
 import streamlit as st
-import pandas as pd
 import altair as alt
 
+from chart_data import box_stats, downsample_line, histogram_bins
+from ingestion import load_upload, upload_digest
+from type_detection import typed_frame
+
+profile.mark("imports")
+
 # Streamlit page config
 st.set_page_config(layout="wide", page_title="Business Insights Dashboard")
 st.title("📊 Dynamic Business Data Dashboard")
 
 # File uploader
 uploaded_file = st.file_uploader("Upload your CSV file", type="csv")
+profile.finish("first render")
 
 if uploaded_file is not None:
-    df = pd.read_csv(uploaded_file, encoding='cp1252')
+    df = load_upload(uploaded_file, encoding='cp1252')
     st.success("✅ File uploaded and parsed!")
 
-    # --- Corrected Data Type Detection ---
-    categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
-    numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns.tolist()
-
-    datetime_cols = []
-    for col in df.columns:
-        if df[col].dtype == 'object':
-            try:
-                parsed_col = pd.to_datetime(df[col], errors='raise', infer_datetime_format=True)
-                if parsed_col.notna().mean() > 0.9:
-                    df[col] = parsed_col
-                    datetime_cols.append(col)
-            except (ValueError, TypeError):
-                continue
+    # --- Sample-based Data Type Detection (cached per file) ---
+    df, column_types = typed_frame(df, upload_digest(uploaded_file))
+    categorical_cols = column_types['categorical']
+    numeric_cols = column_types['numeric']
+    datetime_cols = list(column_types['datetime'])
 
     # Data Preview
     st.subheader("📋 Uploaded Data: Data Preview")
@@ -45,10 +45,12 @@ if uploaded_file is not None:
     # --- Main Area Visualizations ---
     if chart_type == "Histogram" and selected_num_col != "None":
         st.subheader(f"📊 Histogram of {selected_num_col}")
-        hist_chart = alt.Chart(df).mark_bar().encode(
-            x=alt.X(selected_num_col, bin=True),
-            y='count()',
-            tooltip=[selected_num_col, 'count()']
+        hist_data = histogram_bins(df[selected_num_col])
+        hist_chart = alt.Chart(hist_data).mark_bar().encode(
+            x=alt.X('bin_start', bin='binned', title=selected_num_col),
+            x2='bin_end',
+            y=alt.Y('count', title='Count of Records'),
+            tooltip=['bin_start', 'bin_end', 'count']
         ).properties(width=800, height=400)
         st.altair_chart(hist_chart, use_container_width=True)
 
@@ -65,6 +67,7 @@ if uploaded_file is not None:
     elif chart_type == "Line Chart" and selected_date_col != "None" and selected_num_col != "None":
         st.subheader(f"🕒 {aggregation_func.capitalize()} {selected_num_col} over {selected_date_col}")
         time_data = df.groupby(selected_date_col)[selected_num_col].agg(aggregation_func).reset_index()
+        time_data = downsample_line(time_data, selected_date_col, selected_num_col)
         line_chart = alt.Chart(time_data).mark_line().encode(
             x=selected_date_col,
             y=selected_num_col,
@@ -74,11 +77,25 @@ if uploaded_file is not None:
 
     elif chart_type == "Box Plot" and selected_cat_col != "None" and selected_num_col != "None":
         st.subheader(f"🎯 Distribution of {selected_num_col} across {selected_cat_col}")
-        box_chart = alt.Chart(df).mark_boxplot().encode(
-            x=alt.X(selected_cat_col),
-            y=alt.Y(selected_num_col),
-            tooltip=[selected_cat_col, selected_num_col]
-        ).properties(width=800, height=400)
+        box_data, outlier_data = box_stats(df, selected_cat_col, selected_num_col)
+        x_axis = alt.X('category:N', title=selected_cat_col)
+        base = alt.Chart(box_data).encode(x=x_axis)
+        whiskers = base.mark_rule().encode(
+            y=alt.Y('whisker_low:Q', title=selected_num_col),
+            y2='whisker_high:Q'
+        )
+        boxes = base.mark_bar(size=20).encode(
+            y='q1:Q',
+            y2='q3:Q',
+            tooltip=['category', 'q1', 'median', 'q3', 'whisker_low', 'whisker_high']
+        )
+        medians = base.mark_tick(color='white', size=20).encode(y='median:Q')
+        outliers = alt.Chart(outlier_data).mark_point().encode(
+            x=x_axis,
+            y='value:Q',
+            tooltip=['category', 'value']
+        )
+        box_chart = (whiskers + boxes + medians + outliers).properties(width=800, height=400)
         st.altair_chart(box_chart, use_container_width=True)
 
     else:
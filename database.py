@@ -0,0 +1,163 @@
+import os
+import queue
+import sqlite3
+import threading
+
+POOL_SIZE = 8
+STATEMENT_CACHE_SIZE = 256
+
+PRAGMAS = [
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA cache_size = -16000',
+    'PRAGMA busy_timeout = 5000',
+    'PRAGMA foreign_keys = ON',
+    'PRAGMA temp_store = MEMORY',
+]
+
+
+def _create_users(db):
+    db.execute(
+        'CREATE TABLE IF NOT EXISTS users ('
+        ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+        ' username TEXT UNIQUE NOT NULL,'
+        ' password_hash TEXT NOT NULL)'
+    )
+
+
+def _add_column(db, table, column, definition):
+    columns = {row[1] for row in db.execute(f'PRAGMA table_info({table})')}
+    if column not in columns:
+        db.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+
+
+def _add_user_profile(db):
+    _add_column(db, 'users', 'yearly_income', 'TEXT')
+    _add_column(db, 'users', 'business_type', 'TEXT')
+    _add_column(db, 'users', 'marketing_strategy', 'TEXT')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_users_business_type ON users (business_type)')
+
+
+def _create_datasets(db):
+    db.execute(
+        'CREATE TABLE IF NOT EXISTS datasets ('
+        ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+        ' user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,'
+        ' kind TEXT NOT NULL,'
+        ' digest TEXT NOT NULL,'
+        ' columns TEXT NOT NULL,'
+        ' row_count INTEGER NOT NULL DEFAULT 0,'
+        ' created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,'
+        ' UNIQUE (user_id, kind))'
+    )
+    db.execute(
+        'CREATE TABLE IF NOT EXISTS dataset_parts ('
+        ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+        ' dataset_id INTEGER NOT NULL REFERENCES datasets (id) ON DELETE CASCADE,'
+        ' category TEXT,'
+        ' first_day TEXT,'
+        ' last_day TEXT,'
+        ' row_count INTEGER NOT NULL)'
+    )
+    db.execute(
+        'CREATE TABLE IF NOT EXISTS dataset_columns ('
+        ' part_id INTEGER NOT NULL REFERENCES dataset_parts (id) ON DELETE CASCADE,'
+        ' name TEXT NOT NULL,'
+        ' data BLOB NOT NULL,'
+        ' PRIMARY KEY (part_id, name)) WITHOUT ROWID'
+    )
+    db.execute('CREATE INDEX IF NOT EXISTS idx_dataset_parts_category ON dataset_parts (dataset_id, category, first_day)')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_dataset_parts_days ON dataset_parts (dataset_id, first_day, last_day)')
+
+
+# (version, migration) pairs; applied in order and recorded in PRAGMA user_version.
+MIGRATIONS = [
+    (1, _create_users),
+    (2, _add_user_profile),
+    (3, _create_datasets),
+]
+
+
+def migrate(db):
+    """Applies every migration newer than the database's user_version."""
+    current = db.execute('PRAGMA user_version').fetchone()[0]
+    for version, migration in MIGRATIONS:
+        if version <= current:
+            continue
+        try:
+            db.execute('BEGIN IMMEDIATE')
+            migration(db)
+            db.execute(f'PRAGMA user_version = {version}')
+            db.execute('COMMIT')
+        except Exception:
+            db.execute('ROLLBACK')
+            raise
+
+
+def connect(path):
+    """Opens a tuned connection: WAL journal, relaxed fsync, larger page cache, busy timeout."""
+    db = sqlite3.connect(path, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+    db.row_factory = sqlite3.Row
+    for pragma in PRAGMAS:
+        db.execute(pragma)
+    return db
+
+
+class ConnectionPool:
+    """Keeps up to `size` open connections per worker process and hands them out per request."""
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue(maxsize=self.size)
+        self._migrated = False
+
+    def acquire(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Connections must not cross a fork; start a fresh pool in the child.
+                self._reset()
+            if not self._migrated:
+                db = connect(self.path)
+                migrate(db)
+                self._migrated = True
+                return db
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return connect(self.path)
+
+    def release(self, db):
+        if db.in_transaction:
+            db.rollback()
+        if self._pid != os.getpid():
+            db.close()
+            return
+        try:
+            self._idle.put_nowait(db)
+        except queue.Full:
+            db.close()
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path):
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None:
+            pool = _pools[path] = ConnectionPool(path)
+        return pool
@@ -0,0 +1,337 @@
+import io
+import json
+import logging
+import os
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from database import get_pool
+from ingestion import iter_csv_chunks, load_upload, upload_digest
+
+logger = logging.getLogger(__name__)
+SAVE_FAILED_MESSAGE = "Couldn't save this upload to your account; it is still used below."
+
+DATABASE = os.environ.get('DATABASE', 'users.db')
+PART_ROWS = int(os.environ.get('DATASET_PART_ROWS', 50_000))
+COMPRESSION_LEVEL = 1
+MAX_CACHED_LOADS = 4
+
+# Date and category columns each dataset kind is partitioned and indexed by.
+DATASET_KEYS = {
+    'bakery': ('Order Date', 'Category'),
+    'gifts': ('Order Date', 'Product Category'),
+    'clothing': ('Date', 'Category'),
+}
+
+def _string_dtype_name(dtype):
+    if isinstance(dtype, pd.StringDtype):
+        return 'str' if dtype.na_value is np.nan else f'string[{dtype.storage}]'
+    return 'object'
+
+
+def _pack(values, prefix=''):
+    """Flattens a column's values into plain numpy arrays, so blocks can be loaded without pickle."""
+    if isinstance(values, pd.Categorical):
+        return {
+            f'{prefix}kind': np.array('category'),
+            f'{prefix}codes': values.codes,
+            f'{prefix}ordered': np.array(values.ordered),
+            **_pack(values.categories.array, f'{prefix}categories.'),
+        }
+    if isinstance(values, (pd.arrays.BooleanArray, pd.arrays.IntegerArray, pd.arrays.FloatingArray)):
+        return {
+            f'{prefix}kind': np.array('masked'),
+            f'{prefix}dtype': np.array(str(values.dtype)),
+            f'{prefix}values': values.to_numpy(dtype=values.dtype.numpy_dtype, na_value=0),
+            f'{prefix}mask': np.asarray(values.isna()),
+        }
+    if isinstance(values.dtype, pd.StringDtype) or pd.api.types.is_object_dtype(values.dtype):
+        objects = np.asarray(values, dtype=object)
+        if pd.api.types.infer_dtype(objects, skipna=True) not in ('string', 'empty'):
+            inferred = pd.array(objects)
+            if pd.api.types.is_object_dtype(inferred.dtype):
+                raise TypeError(f'Cannot store a column of {pd.api.types.infer_dtype(objects)} values')
+            # e.g. booleans with gaps; packed as a masked array and turned back into objects on load.
+            return {**_pack(inferred, prefix), f'{prefix}object': np.array(True)}
+        mask = np.asarray(pd.isna(values))
+        encoded = [b'' if missing else value.encode('utf-8') for value, missing in zip(objects, mask)]
+        return {
+            f'{prefix}kind': np.array('string'),
+            f'{prefix}dtype': np.array(_string_dtype_name(values.dtype)),
+            f'{prefix}offsets': np.cumsum([0, *map(len, encoded)], dtype=np.int64),
+            f'{prefix}data': np.frombuffer(b''.join(encoded), dtype=np.uint8),
+            f'{prefix}mask': mask,
+        }
+    array = np.asarray(values)
+    if array.dtype == object:
+        raise TypeError(f'Cannot store a column of dtype {values.dtype}')
+    return {f'{prefix}kind': np.array('numpy'), f'{prefix}values': array}
+
+
+def _unpack(arrays, prefix=''):
+    kind = str(arrays[f'{prefix}kind'])
+    if f'{prefix}object' in arrays:
+        masked = _unpack({key: arrays[key] for key in arrays if key != f'{prefix}object'}, prefix)
+        return pd.array(masked.to_numpy(dtype=object, na_value=np.nan), dtype=object)
+    if kind == 'category':
+        categories = pd.Index(_unpack(arrays, f'{prefix}categories.'))
+        return pd.Categorical.from_codes(arrays[f'{prefix}codes'], categories, ordered=bool(arrays[f'{prefix}ordered']))
+    if kind == 'masked':
+        dtype = pd.api.types.pandas_dtype(str(arrays[f'{prefix}dtype']))
+        return dtype.construct_array_type()(arrays[f'{prefix}values'], arrays[f'{prefix}mask'])
+    if kind == 'string':
+        offsets, data, mask = arrays[f'{prefix}offsets'], arrays[f'{prefix}data'].tobytes(), arrays[f'{prefix}mask']
+        strings = np.array([
+            None if missing else data[start:end].decode('utf-8')
+            for start, end, missing in zip(offsets[:-1], offsets[1:], mask)
+        ], dtype=object)
+        dtype = str(arrays[f'{prefix}dtype'])
+        if dtype == 'object':
+            strings[mask] = np.nan
+            return pd.array(strings, dtype=object)
+        return pd.array(strings, dtype=dtype)
+    return arrays[f'{prefix}values']
+
+
+def _encode(values):
+    buffer = io.BytesIO()
+    np.savez(buffer, **_pack(values))
+    return zlib.compress(buffer.getvalue(), COMPRESSION_LEVEL)
+
+
+def _decode(data):
+    with np.load(io.BytesIO(zlib.decompress(data)), allow_pickle=False) as arrays:
+        return _unpack(arrays)
+
+
+def _day(value):
+    return None if pd.isna(value) else value.strftime('%Y-%m-%d')
+
+
+def _partitions(df, date_col, category_col):
+    """Splits df into row groups of one category and month, at most PART_ROWS long."""
+    keys, sort_by = [], []
+    if category_col is not None:
+        keys.append(pd.factorize(df[category_col], sort=True)[0])
+        sort_by.append(category_col)
+    if date_col is not None:
+        dates = df[date_col]
+        keys.append((dates.dt.year * 12 + dates.dt.month).fillna(-1).to_numpy())
+        sort_by.append(date_col)
+    if not keys:
+        boundaries = [0]
+    else:
+        order = np.lexsort(keys[::-1])
+        df = df.iloc[order]
+        stacked = np.column_stack([key[order] for key in keys])
+        boundaries = np.flatnonzero((stacked[1:] != stacked[:-1]).any(axis=1)) + 1
+        boundaries = [0, *boundaries.tolist()]
+
+    for start, end in zip(boundaries, [*boundaries[1:], len(df)]):
+        for offset in range(start, end, PART_ROWS):
+            yield df.iloc[offset:min(offset + PART_ROWS, end)]
+
+
+class DatasetStore:
+    """Per-user sales datasets kept in the users database as compressed column blocks.
+
+    Each dataset is split into row groups of one category and month. The
+    group's category and first/last day are indexed, and every column of
+    a group is stored as its own compressed blob, so a query reads only
+    the groups and columns it asks for.
+    """
+
+    def __init__(self, path=DATABASE):
+        self.path = path
+        self._loads = OrderedDict()
+        self._loads_lock = threading.Lock()
+
+    def _connection(self):
+        return get_pool(self.path).acquire()
+
+    def _release(self, db):
+        get_pool(self.path).release(db)
+
+    def info(self, user_id, kind):
+        """Returns the stored dataset's id, digest, columns and row count, or None."""
+        db = self._connection()
+        try:
+            row = db.execute(
+                'SELECT id, digest, columns, row_count FROM datasets WHERE user_id = ? AND kind = ?',
+                (user_id, kind),
+            ).fetchone()
+        finally:
+            self._release(db)
+        if row is None:
+            return None
+        return {'id': row['id'], 'digest': row['digest'], 'columns': json.loads(row['columns']),
+                'row_count': row['row_count']}
+
+    def save(self, user_id, kind, frames, digest):
+        """Replaces the user's dataset of this kind with frames (one DataFrame or an iterable of them)."""
+        if isinstance(frames, pd.DataFrame):
+            frames = [frames]
+        date_col, category_col = DATASET_KEYS.get(kind, (None, None))
+
+        db = self._connection()
+        try:
+            db.execute('BEGIN IMMEDIATE')
+            db.execute('DELETE FROM datasets WHERE user_id = ? AND kind = ?', (user_id, kind))
+            dataset_id = db.execute(
+                'INSERT INTO datasets (user_id, kind, digest, columns) VALUES (?, ?, ?, ?)',
+                (user_id, kind, digest, '[]'),
+            ).lastrowid
+
+            columns, rows = None, 0
+            for frame in frames:
+                columns = columns or list(frame.columns)
+                dates = date_col if date_col in frame.columns else None
+                categories = category_col if category_col in frame.columns else None
+                for part in _partitions(frame, dates, categories):
+                    part_id = db.execute(
+                        'INSERT INTO dataset_parts (dataset_id, category, first_day, last_day, row_count)'
+                        ' VALUES (?, ?, ?, ?, ?)',
+                        (
+                            dataset_id,
+                            None if categories is None else str(part[categories].iloc[0]),
+                            None if dates is None else _day(part[dates].min()),
+                            None if dates is None else _day(part[dates].max()),
+                            len(part),
+                        ),
+                    ).lastrowid
+                    db.executemany(
+                        'INSERT INTO dataset_columns (part_id, name, data) VALUES (?, ?, ?)',
+                        [(part_id, name, _encode(part[name].array)) for name in columns],
+                    )
+                    rows += len(part)
+
+            db.execute(
+                'UPDATE datasets SET columns = ?, row_count = ? WHERE id = ?',
+                (json.dumps(columns or []), rows, dataset_id),
+            )
+            db.execute('COMMIT')
+        except Exception:
+            db.execute('ROLLBACK')
+            raise
+        finally:
+            self._release(db)
+
+    def iter_frames(self, user_id, kind, columns=None, start=None, end=None, categories=None):
+        """Yields the stored rows one row group at a time, restricted to the requested slice.
+
+        `start`/`end` are inclusive dates and `categories` a list of
+        category values; only row groups whose indexed range overlaps the
+        slice are read, and their rows are then filtered exactly. Rows come
+        back ordered by category and date rather than in upload order.
+        """
+        info = self.info(user_id, kind)
+        if info is None:
+            return
+        date_col, category_col = DATASET_KEYS.get(kind, (None, None))
+        names = info['columns'] if columns is None else [c for c in info['columns'] if c in columns]
+        needed = list(dict.fromkeys(names + [
+            c for c, used in ((date_col, start or end), (category_col, categories))
+            if used and c in info['columns']
+        ]))
+
+        query = 'SELECT id FROM dataset_parts WHERE dataset_id = ?'
+        params = [info['id']]
+        if categories is not None:
+            query += f" AND category IN ({', '.join('?' * len(categories))})"
+            params += [str(category) for category in categories]
+        if start is not None:
+            query += ' AND last_day >= ?'
+            params.append(pd.Timestamp(start).strftime('%Y-%m-%d'))
+        if end is not None:
+            query += ' AND first_day <= ?'
+            params.append(pd.Timestamp(end).strftime('%Y-%m-%d'))
+
+        db = self._connection()
+        try:
+            part_ids = [row['id'] for row in db.execute(query + ' ORDER BY id', params)]
+            placeholders = ', '.join('?' * len(needed))
+            for part_id in part_ids:
+                blobs = dict(db.execute(
+                    f'SELECT name, data FROM dataset_columns WHERE part_id = ? AND name IN ({placeholders})',
+                    [part_id, *needed],
+                ).fetchall())
+                frame = pd.DataFrame({name: _decode(blobs[name]) for name in needed})
+                if start is not None and date_col in frame.columns:
+                    frame = frame[frame[date_col] >= pd.Timestamp(start)]
+                if end is not None and date_col in frame.columns:
+                    frame = frame[frame[date_col] < pd.Timestamp(end) + pd.Timedelta(days=1)]
+                if categories is not None and category_col in frame.columns:
+                    frame = frame[frame[category_col].isin(categories)]
+                yield frame[names]
+        finally:
+            self._release(db)
+
+    def load(self, user_id, kind, columns=None, start=None, end=None, categories=None):
+        """Returns the requested slice as one DataFrame, or None if the user has no such dataset.
+
+        Recent slices are kept in memory per stored digest, and callers get
+        a shallow copy, as with ingestion.load_upload.
+        """
+        info = self.info(user_id, kind)
+        if info is None:
+            return None
+        key = (user_id, kind, info['digest'], repr(columns and sorted(columns)), str(start), str(end),
+               repr(categories and sorted(map(str, categories))))
+        with self._loads_lock:
+            if key in self._loads:
+                self._loads.move_to_end(key)
+                return self._loads[key].copy(deep=False)
+
+        frames = list(self.iter_frames(user_id, kind, columns, start, end, categories))
+        if not frames:
+            # Nothing matched; take the requested columns and dtypes from an unfiltered row group.
+            frames = [next(self.iter_frames(user_id, kind, columns), pd.DataFrame(columns=columns)).iloc[:0]]
+        df = pd.concat(frames, ignore_index=True)
+
+        with self._loads_lock:
+            self._loads[key] = df
+            while len(self._loads) > MAX_CACHED_LOADS:
+                self._loads.popitem(last=False)
+        return df.copy(deep=False)
+
+    def head(self, user_id, kind, rows=5):
+        """Returns the first rows of the stored dataset without decoding the rest."""
+        return next(self.iter_frames(user_id, kind), pd.DataFrame()).head(rows)
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = DatasetStore()
+    return _store
+
+
+def remember_upload(user_id, uploaded_file, schema, streaming=False):
+    """Saves an upload as the user's dataset of its schema unless the same file is already stored.
+
+    Saving is best-effort: returns False, after logging why, when the user
+    no longer exists, the database is locked or a column cannot be stored,
+    so the page can warn and keep rendering its upload.
+    """
+    if user_id is None:
+        return True
+    try:
+        store = get_store()
+        digest = upload_digest(uploaded_file)
+        stored = store.info(user_id, schema.name)
+        if stored is not None and stored['digest'] == digest:
+            return True
+        frames = iter_csv_chunks(uploaded_file, schema) if streaming else load_upload(uploaded_file, schema)
+        store.save(user_id, schema.name, frames, digest)
+    except (sqlite3.Error, ValueError, TypeError):
+        logger.exception('Could not save the %s upload for user %s', schema.name, user_id)
+        return False
+    return True
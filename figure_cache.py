@@ -0,0 +1,67 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+FIGURE_FORMAT = os.environ.get('FIGURE_FORMAT', 'png')
+FIGURE_DPI = int(os.environ.get('FIGURE_DPI', 200))
+MAX_CACHED_FIGURES = 64
+MAX_CACHED_BYTES = 64 * 1024 * 1024
+
+_figures = OrderedDict()
+_figures_lock = threading.Lock()
+# pyplot keeps global state, so figures are drawn and rendered one at a time.
+_render_lock = threading.Lock()
+
+
+def data_key(*parts):
+    """Hashes the frames, series and plain values a figure is drawn from."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (pd.DataFrame, pd.Series)):
+            digest.update(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+            digest.update(repr(list(part.columns) if isinstance(part, pd.DataFrame) else part.name).encode())
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def render_figure(fig, fmt=FIGURE_FORMAT, dpi=FIGURE_DPI):
+    """Renders a figure to PNG or SVG bytes and closes it."""
+    import matplotlib.pyplot as plt
+
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches='tight')
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def cached_figure(key, draw, fmt=FIGURE_FORMAT, dpi=FIGURE_DPI):
+    """Returns the rendered bytes for key, calling draw() for a new figure only on a miss.
+
+    `draw` must return a matplotlib figure; it is rendered and closed right
+    away, so no figure outlives the call. Entries are evicted least
+    recently used first once the count or byte budget is exceeded.
+    """
+    key = (key, fmt, dpi)
+    with _figures_lock:
+        if key in _figures:
+            _figures.move_to_end(key)
+            return _figures[key]
+
+    with _render_lock:
+        image = render_figure(draw(), fmt, dpi)
+
+    with _figures_lock:
+        _figures[key] = image
+        total = sum(len(entry) for entry in _figures.values())
+        while len(_figures) > 1 and (len(_figures) > MAX_CACHED_FIGURES or total > MAX_CACHED_BYTES):
+            _, evicted = _figures.popitem(last=False)
+            total -= len(evicted)
+    return image
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+CACHE_DIR = os.environ.get('FORECAST_CACHE_DIR', '.forecast_cache')
+# What a truncated, corrupt or older-format entry raises while being unpickled or decoded.
+DECODE_ERRORS = (pickle.UnpicklingError, EOFError, ValueError, KeyError, IndexError, TypeError,
+                 AttributeError, ImportError)
+LINEAGE_ROWS = 14
+
+
+def series_key(history, periods, settings):
+    """Builds a cache key from the ds/y content, model settings and horizon."""
+    digest = hashlib.sha256()
+    hashed = pd.util.hash_pandas_object(history[['ds', 'y']], index=False)
+    digest.update(hashed.to_numpy().tobytes())
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode())
+    digest.update(str(periods).encode())
+    return digest.hexdigest()
+
+
+def lineage_key(history, periods, settings):
+    """Builds a key shared by a series and its later extensions: its first rows, settings and horizon."""
+    return 'lineage-' + series_key(history.head(LINEAGE_ROWS), periods, settings)
+
+
+class ForecastCache:
+    """Two-level LRU cache: hot entries in memory, everything spilled to disk."""
+
+    def __init__(self, directory=CACHE_DIR, max_entries=32, max_disk_bytes=256 * 1024 * 1024,
+                 encode=None, decode=None):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.encode = encode or (lambda value: value)
+        self.decode = decode or (lambda value: value)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.pkl')
+
+    def get(self, key):
+        """Returns the cached value for key, or None on a miss."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = self.decode(pickle.load(f))
+            os.utime(path)
+        except OSError:
+            return None
+        except DECODE_ERRORS:
+            # Unreadable entry; drop it so the value is recomputed and rewritten.
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+        self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        """Stores value in memory and writes it through to disk."""
+        self._remember(key, value)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self._path(key) + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(self.encode(value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+            self._evict_disk()
+        except OSError:
+            pass
+
+    def clear(self):
+        """Drops every entry from memory and disk."""
+        with self._lock:
+            self._memory.clear()
+        for name in self._disk_entries():
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _disk_entries(self):
+        try:
+            return [name for name in os.listdir(self.directory) if name.endswith('.pkl')]
+        except OSError:
+            return []
+
+    def _evict_disk(self):
+        entries = []
+        for name in self._disk_entries():
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+                total -= size
+            except OSError:
+                pass
@@ -0,0 +1,265 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from statistics import NormalDist
+
+import numpy as np
+
+from fast_forecast import fast_forecast_many
+from forecast_cache import CACHE_DIR, ForecastCache, lineage_key, series_key
+
+DEFAULT_SETTINGS = {'daily_seasonality': True}
+FORECAST_WORKERS = int(os.environ.get('FORECAST_WORKERS', os.cpu_count() or 1))
+FORECAST_ENGINES = ('prophet', 'fast')
+INCREMENTAL_LOOKBACK_DAYS = int(os.environ.get('FORECAST_INCREMENTAL_DAYS', 31))
+# 'sampled' is Prophet's Monte Carlo band, 'analytic' a band from the fitted
+# observation noise, and 'none' skips intervals (yhat_lower/upper are NaN).
+INTERVAL_METHODS = ('sampled', 'analytic', 'none')
+
+
+# prophet (and the Stan backend it loads) and matplotlib are imported where
+# they are first needed, so pages can render before the forecasting stack loads.
+
+
+def _encode(entry):
+    from prophet.serialize import model_to_json
+
+    model, forecast = entry
+    return model_to_json(model), forecast
+
+
+def _decode(entry):
+    from prophet.serialize import model_from_json
+
+    model_json, forecast = entry
+    return model_from_json(model_json), forecast
+
+
+forecast_cache = ForecastCache(encode=_encode, decode=_decode)
+# Last fitted day and parameters per series lineage, for warm starts.
+fit_index = ForecastCache(directory=os.path.join(CACHE_DIR, 'lineage'), max_entries=256,
+                          max_disk_bytes=16 * 1024 * 1024)
+
+
+def _warm_start_params(model):
+    """Extracts fitted parameters in the shape Prophet.fit(init=...) expects."""
+    params = {name: model.params[name][0][0] for name in ('k', 'm', 'sigma_obs')}
+    params.update({name: model.params[name][0] for name in ('delta', 'beta')})
+    return params
+
+
+def _previous_fit_params(history, periods, settings):
+    """Finds the last fit of this series if the history extends it by at most the lookback days."""
+    previous = fit_index.get(lineage_key(history, periods, settings))
+    if previous is None:
+        return None
+    new_days = (history['ds'].max() - previous['last_day']).days
+    return previous['params'] if 0 < new_days <= INCREMENTAL_LOOKBACK_DAYS else None
+
+
+def _remember_fit(history, periods, settings, model):
+    fit_index.put(lineage_key(history, periods, settings),
+                  {'last_day': history['ds'].max(), 'params': _warm_start_params(model)})
+
+
+def _cache_settings(settings, intervals, future_only):
+    """Settings that identify a cached forecast; the default predict mode keeps its original keys."""
+    if intervals == 'sampled' and not future_only:
+        return settings
+    return {**settings, 'intervals': intervals, 'future_only': future_only}
+
+
+def _analytic_intervals(model, forecast):
+    """Adds a band from the fitted noise level, widened with the horizon; ignores trend uncertainty."""
+    sigma = model.params['sigma_obs'][0][0] * model.y_scale
+    z = NormalDist().inv_cdf(0.5 + model.interval_width / 2)
+    last_day = model.history['ds'].max()
+    horizon = (forecast['ds'] - last_day).dt.days.clip(lower=0).to_numpy()
+    spread = z * sigma * np.sqrt(1 + horizon / len(model.history))
+    forecast['yhat_lower'] = forecast['yhat'] - spread
+    forecast['yhat_upper'] = forecast['yhat'] + spread
+    return forecast
+
+
+def _fit_predict(history, periods, settings, init=None, intervals='sampled', future_only=False):
+    from prophet import Prophet
+
+    if intervals not in INTERVAL_METHODS:
+        raise ValueError(f"Unknown interval method: {intervals}")
+    if intervals != 'sampled':
+        settings = {**settings, 'uncertainty_samples': 0}
+
+    model = Prophet(**settings)
+    if init is None:
+        model.fit(history)
+    else:
+        try:
+            model.fit(history, init=init)
+        except RuntimeError:
+            # The optimizer rejected the stored parameters; fall back to a cold fit.
+            model = Prophet(**settings)
+            model.fit(history)
+
+    future = model.make_future_dataframe(periods=periods, include_history=not future_only)
+    forecast = model.predict(future)
+    if intervals == 'analytic':
+        forecast = _analytic_intervals(model, forecast)
+    elif intervals == 'none':
+        forecast['yhat_lower'] = forecast['yhat_upper'] = np.nan
+    return model, forecast
+
+
+def _fit_predict_remote(history, periods, settings, init=None, intervals='sampled', future_only=False):
+    """Worker-process entry point; models travel back as JSON."""
+    return _encode(_fit_predict(history, periods, settings, init, intervals, future_only))
+
+
+def prophet_forecast(history, periods, incremental=True, intervals='sampled', future_only=False, **settings):
+    """Fits Prophet on a ds/y frame and predicts `periods` days ahead, reusing cached fits.
+
+    With `incremental`, a series that extends a previously fitted one by a
+    few days is warm-started from the earlier fit's parameters.
+    `intervals` picks one of INTERVAL_METHODS, and `future_only` predicts
+    just the `periods` new days instead of the history as well.
+    """
+    settings = {**DEFAULT_SETTINGS, **settings}
+    key_settings = _cache_settings(settings, intervals, future_only)
+    key = series_key(history, periods, key_settings)
+
+    cached = forecast_cache.get(key)
+    if cached is not None:
+        return cached
+
+    init = _previous_fit_params(history, periods, key_settings) if incremental else None
+    entry = _fit_predict(history, periods, settings, init, intervals, future_only)
+    forecast_cache.put(key, entry)
+    _remember_fit(history, periods, key_settings, entry[0])
+    return entry
+
+
+# One long-lived pool per worker count, shared by every session, so workers
+# keep prophet loaded between calls instead of paying its import each time.
+# forkserver (spawn where it is unavailable) avoids forking a process that
+# has Streamlit's and Flask's threads running.
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _process_pool(workers):
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            pool = _pools[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context(method))
+        return pool
+
+
+def _discard_pool(workers, pool):
+    """Drops a broken pool so the next call starts a fresh one."""
+    with _pools_lock:
+        if _pools.get(workers) is pool:
+            del _pools[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def prophet_forecast_many(histories, periods, workers=None, incremental=True, intervals='sampled',
+                          future_only=False, **settings):
+    """Forecasts several ds/y frames, fitting cache misses in a process pool.
+
+    Results come back as a list of (model, forecast) in the same order as
+    `histories`. With `workers` <= 1, or if the pool cannot be used, the
+    fits run serially in this process.
+    """
+    settings = {**DEFAULT_SETTINGS, **settings}
+    key_settings = _cache_settings(settings, intervals, future_only)
+    workers = FORECAST_WORKERS if workers is None else workers
+
+    keys = [series_key(history, periods, key_settings) for history in histories]
+    results = [forecast_cache.get(key) for key in keys]
+    pending = [i for i, result in enumerate(results) if result is None]
+    inits = {i: _previous_fit_params(histories[i], periods, key_settings) if incremental else None for i in pending}
+
+    if workers > 1 and len(pending) > 1:
+        pool, futures = None, {}
+        try:
+            pool = _process_pool(workers)
+            for i in pending:
+                futures[i] = pool.submit(_fit_predict_remote, histories[i], periods, settings, inits[i],
+                                         intervals, future_only)
+            for i, future in futures.items():
+                results[i] = _decode(future.result())
+                forecast_cache.put(keys[i], results[i])
+                _remember_fit(histories[i], periods, key_settings, results[i][0])
+        except (BrokenProcessPool, OSError):
+            if pool is not None:
+                _discard_pool(workers, pool)
+        finally:
+            # The pool outlives this call, so don't leave its queue full of unwanted fits.
+            for future in futures.values():
+                future.cancel()
+
+    for i in pending:
+        if results[i] is None:
+            results[i] = _fit_predict(histories[i], periods, settings, inits[i], intervals, future_only)
+            forecast_cache.put(keys[i], results[i])
+            _remember_fit(histories[i], periods, key_settings, results[i][0])
+
+    return results
+
+
+def _fast_forecasts(histories, periods, intervals, future_only):
+    forecasts = fast_forecast_many(histories, periods)
+    for forecast in forecasts:
+        if intervals == 'none':
+            forecast['yhat_lower'] = forecast['yhat_upper'] = np.nan
+    if future_only:
+        forecasts = [forecast.iloc[-periods:].reset_index(drop=True) for forecast in forecasts]
+    return forecasts
+
+
+def run_forecasts(histories, periods, engine='prophet', workers=None, intervals='sampled', future_only=False):
+    """Forecasts ds/y frames with the chosen engine; returns (model, forecast) pairs.
+
+    The fast engine has no fitted model object, so its pairs carry None.
+    Its band is always the analytic one, so only intervals='none' changes it.
+    """
+    if engine == 'fast':
+        return [(None, forecast) for forecast in _fast_forecasts(histories, periods, intervals, future_only)]
+    if engine != 'prophet':
+        raise ValueError(f"Unknown forecast engine: {engine}")
+    return prophet_forecast_many(histories, periods, workers=workers, intervals=intervals, future_only=future_only)
+
+
+def run_forecast(history, periods, engine='prophet', intervals='sampled', future_only=False):
+    """Forecasts a single ds/y frame with the chosen engine."""
+    if engine == 'prophet':
+        return prophet_forecast(history, periods, intervals=intervals, future_only=future_only)
+    return run_forecasts([history], periods, engine=engine, intervals=intervals, future_only=future_only)[0]
+
+
+def plot_forecast(model, history, forecast):
+    """Draws a forecast figure, using Prophet's own plot when a model is available."""
+    if model is not None:
+        fig = model.plot(forecast)
+        if not model.uncertainty_samples and forecast['yhat_lower'].notna().any():
+            # Prophet only draws the band it sampled itself; add the analytic one.
+            fig.gca().fill_between(
+                forecast['ds'].dt.to_pydatetime(), forecast['yhat_lower'], forecast['yhat_upper'],
+                color='#0072B2', alpha=0.2,
+            )
+        return fig
+
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.plot(history['ds'], history['y'], 'k.')
+    ax.plot(forecast['ds'], forecast['yhat'], ls='-', c='#0072B2')
+    ax.fill_between(forecast['ds'], forecast['yhat_lower'], forecast['yhat_upper'], color='#0072B2', alpha=0.2)
+    ax.grid(True, which='major', c='gray', ls='-', lw=1, alpha=0.2)
+    ax.set_xlabel('ds')
+    ax.set_ylabel('y')
+    fig.tight_layout()
+    return fig
@@ -1,18 +1,40 @@
+from startup_profile import page_profile
+profile = page_profile("forecc")
+
 import streamlit as st
 import pandas as pd
-from prophet import Prophet
-import matplotlib.pyplot as plt
+
+from dataset_store import SAVE_FAILED_MESSAGE, get_store, remember_upload
+from figure_cache import cached_figure, data_key
+from forecasting import FORECAST_ENGINES, INTERVAL_METHODS, plot_forecast, run_forecast, run_forecasts
+from ingestion import CLOTHING_SCHEMA, load_upload
+from series_builder import build_series_matrix
+from user_tokens import user_from_token
+
+profile.mark("imports")
 
 st.set_page_config(page_title="AI-Powered Clothing Sales Dashboard", layout="wide")
 st.title("🧠 AI-Powered Clothing Sales Dashboard with Forecasting")
 
 uploaded_file = st.file_uploader("Upload your clothing sales CSV file", type="csv")
+engine = st.sidebar.selectbox("Forecast engine", FORECAST_ENGINES, format_func=str.capitalize)
+intervals = st.sidebar.selectbox("Forecast intervals", INTERVAL_METHODS, format_func=str.capitalize)
+profile.finish("first render")
+user_id = user_from_token(st.query_params.get("token"))
+saved = get_store().info(user_id, CLOTHING_SCHEMA.name) if user_id is not None else None
 
-if uploaded_file:
+required_columns = ['Date', 'Category', 'Quantity', 'Price', 'Customer Segment']
+
+if uploaded_file or saved:
     try:
-        df = pd.read_csv(uploaded_file, parse_dates=['Date'])
+        if uploaded_file:
+            df = load_upload(uploaded_file, CLOTHING_SCHEMA)
+            if not remember_upload(user_id, uploaded_file, CLOTHING_SCHEMA):
+                st.warning(SAVE_FAILED_MESSAGE)
+        else:
+            st.caption(f"Using your saved dataset ({saved['row_count']:,} rows). Upload a file to replace it.")
+            df = get_store().load(user_id, CLOTHING_SCHEMA.name, columns=required_columns)
 
-        required_columns = ['Date', 'Category', 'Quantity', 'Price', 'Customer Segment']
         missing_columns = [col for col in required_columns if col not in df.columns]
 
         if missing_columns:
@@ -20,8 +42,8 @@ if uploaded_file:
         else:
             df['Revenue'] = df['Quantity'] * df['Price']
 
-            df_grouped = df.groupby('Date').agg({'Revenue': 'sum'}).reset_index()
-            df_grouped = df_grouped.rename(columns={'Date': 'ds', 'Revenue': 'y'})
+            series = build_series_matrix(df, 'Date', 'Category', ['Revenue', 'Quantity'])
+            df_grouped = series.total('Revenue')
 
             st.header("📌 Business Insights & Recommendations")
 
@@ -36,14 +58,12 @@ if uploaded_file:
            
             st.header("📉 Sales Forecasting (Next 6 Months)")
 
-            model = Prophet(daily_seasonality=True)
-            model.fit(df_grouped)
+            model, forecast = run_forecast(df_grouped, periods=180, engine=engine, intervals=intervals)
 
-            future = model.make_future_dataframe(periods=180)
-            forecast = model.predict(future)
-
-            fig = model.plot(forecast)
-            st.pyplot(fig)
+            st.image(cached_figure(
+                data_key('forecast', engine, df_grouped, forecast),
+                lambda: plot_forecast(model, df_grouped, forecast),
+            ))
 
             st.subheader("📈 Forecasted Sales Metrics")
             st.write(f"Predicted Sales (Next 1 Month): ₹{forecast['yhat'].tail(30).sum():,.0f}")
@@ -56,21 +76,11 @@ if uploaded_file:
             st.header("📊 Category-wise Revenue Forecast (Next 3 Months)")
 
             category_forecasts = []
+            forecast_categories = [category for category in top_categories.index if series.row_counts[category] >= 30]
 
-            for category in top_categories.index:
-                cat_df = df[df['Category'] == category]
-                if len(cat_df) < 30:
-                    continue
-
-                daily_rev = cat_df.groupby('Date').agg({'Revenue': 'sum'}).reset_index()
-                daily_rev = daily_rev.rename(columns={'Date': 'ds', 'Revenue': 'y'})
-
-                cat_model = Prophet(daily_seasonality=True)
-                cat_model.fit(daily_rev)
-
-                future_cat = cat_model.make_future_dataframe(periods=90)
-                forecast_cat = cat_model.predict(future_cat)
-
+            revenue_histories = series.histories('Revenue', forecast_categories)
+            revenue_results = run_forecasts(revenue_histories, periods=90, engine=engine, intervals='none', future_only=True)
+            for category, (_, forecast_cat) in zip(forecast_categories, revenue_results):
                 revenue_sum = forecast_cat.tail(90)['yhat'].sum()
                 category_forecasts.append({'Category': category, 'Forecasted Revenue': round(revenue_sum)})
 
@@ -81,20 +91,9 @@ if uploaded_file:
 
             inventory_recommendation = []
 
-            for category in top_categories.index:
-                cat_df = df[df['Category'] == category]
-                if len(cat_df) < 30:
-                    continue
-
-                daily_qty = cat_df.groupby('Date').agg({'Quantity': 'sum'}).reset_index()
-                daily_qty = daily_qty.rename(columns={'Date': 'ds', 'Quantity': 'y'})
-
-                cat_model_qty = Prophet(daily_seasonality=True)
-                cat_model_qty.fit(daily_qty)
-
-                future_qty = cat_model_qty.make_future_dataframe(periods=90)
-                forecast_qty = cat_model_qty.predict(future_qty)
-
+            quantity_histories = series.histories('Quantity', forecast_categories)
+            quantity_results = run_forecasts(quantity_histories, periods=90, engine=engine, intervals='none', future_only=True)
+            for category, (_, forecast_qty) in zip(forecast_categories, quantity_results):
                 total_forecast_qty = forecast_qty.tail(90)['yhat'].sum()
                 inventory_recommendation.append({
                     'Category': category,
@@ -107,9 +106,16 @@ if uploaded_file:
             st.subheader("🧾 Suggested Inventory Split")
             st.dataframe(inv_df.set_index('Category'))
 
-            fig, ax = plt.subplots(figsize=(6, 6))
-            inv_df.set_index('Category')['% of Total Inventory'].plot.pie(autopct='%1.1f%%', ax=ax, ylabel="")
-            st.pyplot(fig)
+            inventory_shares = inv_df.set_index('Category')['% of Total Inventory']
+
+            def draw_inventory_pie():
+                import matplotlib.pyplot as plt
+
+                fig, ax = plt.subplots(figsize=(6, 6))
+                inventory_shares.plot.pie(autopct='%1.1f%%', ax=ax, ylabel="")
+                return fig
+
+            st.image(cached_figure(data_key('inventory-pie', inventory_shares), draw_inventory_pie))
 
     except Exception as e:
         st.error(f"⚠ Error while processing the file: {e}")
@@ -1,20 +1,40 @@
+from startup_profile import page_profile
+profile = page_profile("forecc3")
+
 import pandas as pd
-from prophet import Prophet
 import streamlit as st
-import matplotlib.pyplot as plt
+
+from dataset_store import SAVE_FAILED_MESSAGE, get_store, remember_upload
+from figure_cache import cached_figure, data_key
+from forecasting import FORECAST_ENGINES, INTERVAL_METHODS, plot_forecast, run_forecast, run_forecasts
+from ingestion import GIFTS_SCHEMA, load_upload
+from series_builder import build_series_matrix
+from user_tokens import user_from_token
+
+profile.mark("imports")
 
 
 st.set_page_config(page_title="Personalised Gifts Forecast", layout="wide")
 st.title("🎁 Personalised Gifts Forecasting Dashboard")
 
 uploaded = st.file_uploader("Upload CSV for Personalised Gifts", type="csv")
-if not uploaded:
-    st.info("Please upload a CSV with fields: Order Date, Product Category, Quantity Sold, Price, etc.")
-    st.stop()
-
-df = pd.read_csv(uploaded, parse_dates=["Order Date"])
-
+engine = st.sidebar.selectbox("Forecast engine", FORECAST_ENGINES, format_func=str.capitalize)
+intervals = st.sidebar.selectbox("Forecast intervals", INTERVAL_METHODS, format_func=str.capitalize)
+profile.finish("first render")
+user_id = user_from_token(st.query_params.get("token"))
 required_cols = ["Order Date", "Product Category", "Quantity Sold", "Price"]
+insight_cols = ["Return Rate", "Repeat Purchase Rate", "Review Rating", "Shipping Time"]
+if uploaded:
+    df = load_upload(uploaded, GIFTS_SCHEMA)
+    if not remember_upload(user_id, uploaded, GIFTS_SCHEMA):
+        st.warning(SAVE_FAILED_MESSAGE)
+else:
+    df = get_store().load(user_id, GIFTS_SCHEMA.name, columns=required_cols + insight_cols) if user_id is not None else None
+    if df is None:
+        st.info("Please upload a CSV with fields: Order Date, Product Category, Quantity Sold, Price, etc.")
+        st.stop()
+    st.caption(f"Using your saved dataset ({len(df):,} rows). Upload a file to replace it.")
+
 missing = [col for col in required_cols if col not in df.columns]
 if missing:
     st.error(f"Missing required columns: {', '.join(missing)}")
@@ -25,17 +45,15 @@ df["Total Revenue"] = df["Quantity Sold"] * df["Price"]
 
 st.header("📈 Overall Sales Forecast (Total Revenue)")
 
-daily_rev = df.groupby("Order Date").agg({"Total Revenue": "sum"}).reset_index()
-df_prophet = daily_rev.rename(columns={"Order Date": "ds", "Total Revenue": "y"})
-
-model = Prophet(daily_seasonality=True)
-model.fit(df_prophet)
+series = build_series_matrix(df, "Order Date", "Product Category", ["Total Revenue", "Quantity Sold"])
+df_prophet = series.total("Total Revenue")
 
-future = model.make_future_dataframe(periods=180)
-forecast = model.predict(future)
+model, forecast = run_forecast(df_prophet, periods=180, engine=engine, intervals=intervals)
 
-fig1 = model.plot(forecast)
-st.pyplot(fig1)
+st.image(cached_figure(
+    data_key('forecast', engine, df_prophet, forecast),
+    lambda: plot_forecast(model, df_prophet, forecast),
+))
 
 next_30 = forecast[forecast['ds'] > pd.Timestamp.today()].head(30)['yhat'].sum()
 next_180 = forecast[forecast['ds'] > pd.Timestamp.today()].head(180)['yhat'].sum()
@@ -47,16 +65,11 @@ st.write(f"Projected Revenue (Next 6 Months): ₹{next_180:,.0f}")
 st.header("📦 Forecast: Quantity Sold by Category (Next 3 Months)")
 
 cat_forecasts = []
+forecast_cats = [cat for cat in series.categories if series.active_days[cat] >= 30]
+qty_histories = series.histories("Quantity Sold", forecast_cats)
 
-for cat, group in df.groupby("Product Category"):
-    daily_qty = group.groupby("Order Date")["Quantity Sold"].sum().reset_index()
-    if len(daily_qty) < 30:
-        continue
-    prophet_df = daily_qty.rename(columns={"Order Date": "ds", "Quantity Sold": "y"})
-    model_cat = Prophet(daily_seasonality=True)
-    model_cat.fit(prophet_df)
-    future_cat = model_cat.make_future_dataframe(periods=90)
-    forecast_cat = model_cat.predict(future_cat)
+qty_results = run_forecasts(qty_histories, periods=90, engine=engine, intervals='none', future_only=True)
+for cat, (_, forecast_cat) in zip(forecast_cats, qty_results):
     total_qty = forecast_cat.tail(90)['yhat'].sum()
     cat_forecasts.append({"Product Category": cat, "Forecasted Quantity": int(total_qty)})
 
@@ -65,10 +78,15 @@ cat_df = pd.DataFrame(cat_forecasts)
 if not cat_df.empty:
     st.dataframe(cat_df.set_index("Product Category"))
 
-    fig2, ax2 = plt.subplots()
-    ax2.pie(cat_df["Forecasted Quantity"], labels=cat_df["Product Category"], autopct="%1.1f%%", startangle=90)
-    ax2.axis("equal")
-    st.pyplot(fig2)
+    def draw_category_pie():
+        import matplotlib.pyplot as plt
+
+        fig2, ax2 = plt.subplots()
+        ax2.pie(cat_df["Forecasted Quantity"], labels=cat_df["Product Category"], autopct="%1.1f%%", startangle=90)
+        ax2.axis("equal")
+        return fig2
+
+    st.image(cached_figure(data_key("category-pie", cat_df), draw_category_pie))
 else:
     st.warning("Insufficient data for category-wise forecasting.")
 
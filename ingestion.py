@@ -0,0 +1,251 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+MAX_CACHED_UPLOADS = 8
+MAX_CACHED_BYTES = 512 * 1024 * 1024
+CHUNK_ROWS = int(os.environ.get('INGEST_CHUNK_ROWS', 200_000))
+STREAMING_THRESHOLD_BYTES = int(os.environ.get('STREAMING_THRESHOLD_BYTES', 256 * 1024 * 1024))
+MAX_CATEGORY_RATIO = 0.5
+
+# `compact` maps columns to how compact_frame stores them: 'category' for
+# repeated labels, 'uuid' for identifier strings, and 'integer'/'float' for
+# numbers downcast to the smallest type that holds them losslessly.
+Schema = namedtuple('Schema', ['name', 'dtypes', 'dates', 'date_format', 'compact'], defaults=(None,))
+
+BAKERY_SCHEMA = Schema(
+    name='bakery',
+    dtypes={
+        'Product Name': str, 'Category': str, 'Ingredients': str,
+        'Quantity Sold': 'int64', 'Price': 'float64', 'Cost per Unit': 'float64',
+        'Total Revenue': 'float64', 'Discount Applied': 'bool', 'Customer Segment': str,
+        'Shelf Life (Days)': 'int64', 'Customer Age': 'int64', 'Customer Gender': str,
+        'Payment Method': str, 'Order Type': str, 'Wastage Quantity': 'int64',
+        'Review Rating': 'float64', 'Packaging Type': str,
+    },
+    dates=['Order Date', 'Expiration Date', 'When the Product Was Bought'],
+    date_format='%Y-%m-%d',
+    compact={
+        'Product Name': 'category', 'Category': 'category', 'Ingredients': 'category',
+        'Customer Segment': 'category', 'Customer Gender': 'category', 'Payment Method': 'category',
+        'Order Type': 'category', 'Packaging Type': 'category',
+        'Quantity Sold': 'integer', 'Shelf Life (Days)': 'integer', 'Customer Age': 'integer',
+        'Wastage Quantity': 'integer', 'Review Rating': 'float',
+    },
+)
+
+GIFTS_SCHEMA = Schema(
+    name='gifts',
+    dtypes={
+        'Order ID': 'int64', 'Quantity Sold': 'int64', 'Product Name': str, 'Price': 'float64',
+        'Customer ID': str, 'Customer Age': 'int64', 'Customer Gender': str,
+        'Customer Segment': str, 'Payment Method': str, 'Discount Applied': 'bool',
+        'Product Category': str, 'Review Rating': 'float64', 'Shipping Cost': 'float64',
+        'Shipping Time': 'int64', 'Return Rate': 'float64', 'CAC': 'float64',
+        'CLTV': 'float64', 'Repeat Purchase Rate': 'float64',
+    },
+    dates=['Order Date'],
+    date_format='%Y-%m-%d',
+    compact={
+        'Product Name': 'category', 'Customer Gender': 'category', 'Customer Segment': 'category',
+        'Payment Method': 'category', 'Product Category': 'category', 'Customer ID': 'uuid',
+        'Order ID': 'integer', 'Quantity Sold': 'integer', 'Customer Age': 'integer',
+        'Shipping Time': 'integer', 'Review Rating': 'float',
+    },
+)
+
+CLOTHING_SCHEMA = Schema(
+    name='clothing',
+    dtypes={
+        'Product': str, 'Category': str, 'Quantity': 'int64', 'Price': 'float64',
+        'Review Rating (out of 5)': 'float64', 'Payment Method': str, 'Age': 'int64',
+        'Gender': str, 'Discount Applied': 'bool', 'Customer Segment': str,
+    },
+    dates=['Date'],
+    date_format='%Y-%m-%d',
+    compact={
+        'Product': 'category', 'Category': 'category', 'Payment Method': 'category',
+        'Gender': 'category', 'Customer Segment': 'category',
+        'Quantity': 'integer', 'Age': 'integer', 'Review Rating (out of 5)': 'float',
+    },
+)
+
+_uploads = OrderedDict()
+_uploads_lock = threading.Lock()
+
+
+def _parse_dates(df, schema):
+    for column in schema.dates:
+        if column not in df.columns:
+            continue
+        try:
+            df[column] = pd.to_datetime(df[column], format=schema.date_format)
+        except (ValueError, TypeError):
+            df[column] = pd.to_datetime(df[column])
+    return df
+
+
+def parse_csv(data, schema=None, encoding='utf-8'):
+    """Parses CSV bytes, using the schema's dtypes and date format when they fit the file."""
+    if schema is None:
+        return pd.read_csv(io.BytesIO(data), encoding=encoding)
+
+    try:
+        df = pd.read_csv(io.BytesIO(data), encoding=encoding, dtype=schema.dtypes)
+    except (ValueError, TypeError):
+        # Missing values or stray text in a typed column; let pandas infer instead.
+        df = pd.read_csv(io.BytesIO(data), encoding=encoding)
+    return _parse_dates(df, schema)
+
+
+def _chunk_reader(source, encoding, chunksize, usecols, dtype, skip_rows=0):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return pd.read_csv(
+        source, encoding=encoding, chunksize=chunksize, usecols=usecols, dtype=dtype,
+        skiprows=range(1, skip_rows + 1) if skip_rows else None,
+    )
+
+
+def iter_csv_chunks(source, schema=None, encoding='utf-8', chunksize=CHUNK_ROWS, usecols=None):
+    """Yields a CSV as parsed frames of at most `chunksize` rows.
+
+    `source` is a path or a binary file object such as a Streamlit upload.
+    With `usecols`, only those of the named columns present in the file
+    are parsed. If a chunk does not fit the schema's dtypes, the remaining
+    rows are read with inferred dtypes instead.
+    """
+    if usecols is not None:
+        usecols = set(usecols).__contains__
+    typed = schema is not None
+    reader = _chunk_reader(source, encoding, chunksize, usecols, schema.dtypes if typed else None)
+    rows = 0
+    try:
+        while True:
+            try:
+                chunk = next(reader)
+            except StopIteration:
+                return
+            except (ValueError, TypeError):
+                if not typed:
+                    raise
+                # Missing values or stray text in a typed column; infer from here on.
+                reader.close()
+                typed = False
+                reader = _chunk_reader(source, encoding, chunksize, usecols, None, skip_rows=rows)
+                continue
+            rows += len(chunk)
+            yield _parse_dates(chunk, schema) if schema is not None else chunk
+    finally:
+        reader.close()
+
+
+def read_preview(source, schema=None, encoding='utf-8', rows=5):
+    """Parses only the first rows of a CSV."""
+    return next(iter_csv_chunks(source, schema, encoding, chunksize=rows), pd.DataFrame())
+
+
+class CompactReport(namedtuple('CompactReport', ['before', 'after', 'columns'])):
+    """Deep memory use of a frame before and after compact_frame, overall and per changed column."""
+
+    @property
+    def saved(self):
+        return self.before - self.after
+
+    def __str__(self):
+        share = self.saved / self.before if self.before else 0.0
+        return (f"{self.after / 2**20:,.1f} MB in memory, "
+                f"saved {self.saved / 2**20:,.1f} MB ({share:.0%}) of {self.before / 2**20:,.1f} MB")
+
+
+def _compact_column(series, kind):
+    if kind == 'category':
+        if series.nunique() <= MAX_CATEGORY_RATIO * len(series):
+            return series.astype('category')
+    elif kind == 'uuid':
+        # Repeat customers share one category entry; otherwise Arrow's packed strings beat Python objects.
+        if series.nunique() <= MAX_CATEGORY_RATIO * len(series):
+            return series.astype('category')
+        if pyarrow is not None:
+            return series.astype(pd.StringDtype('pyarrow'))
+    elif kind == 'integer' and pd.api.types.is_integer_dtype(series.dtype):
+        return pd.to_numeric(series, downcast='integer')
+    elif kind == 'float' and pd.api.types.is_float_dtype(series.dtype):
+        narrow = series.astype('float32')
+        if np.array_equal(narrow.to_numpy(dtype='float64'), series.to_numpy(), equal_nan=True):
+            return narrow
+    return series
+
+
+def compact_frame(df, schema):
+    """Stores a parsed frame in the schema's compact column types and reports the bytes saved.
+
+    Columns that do not qualify (too many distinct labels, values a
+    smaller type cannot hold exactly) keep their parsed type.
+    """
+    before = df.memory_usage(deep=True, index=False)
+    for column, kind in (schema.compact or {}).items():
+        if column in df.columns and len(df):
+            df[column] = _compact_column(df[column], kind)
+    after = df.memory_usage(deep=True, index=False)
+    changed = {column: (int(before[column]), int(after[column]))
+               for column in df.columns if after[column] != before[column]}
+    return df, CompactReport(int(before.sum()), int(after.sum()), changed)
+
+
+def upload_digest(uploaded_file):
+    """Returns the SHA-256 of an uploaded file's bytes."""
+    return hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+
+
+def _upload_key(data, schema, encoding, compact):
+    return hashlib.sha256(data).hexdigest(), schema.name if schema else None, encoding, compact
+
+
+def load_upload(uploaded_file, schema=None, encoding='utf-8', compact=True):
+    """Parses an uploaded CSV once per distinct content and serves reruns from a bounded cache.
+
+    With a schema and `compact`, the cached frame is stored through
+    compact_frame, so more uploads fit in the cache's byte budget.
+    Callers get a shallow copy, so adding derived columns does not leak
+    into the cached frame.
+    """
+    data = uploaded_file.getvalue()
+    key = _upload_key(data, schema, encoding, compact)
+
+    with _uploads_lock:
+        if key in _uploads:
+            _uploads.move_to_end(key)
+            return _uploads[key][0].copy(deep=False)
+
+    df = parse_csv(data, schema, encoding)
+    report = None
+    if schema is not None and compact:
+        df, report = compact_frame(df, schema)
+    size = report.after if report else int(df.memory_usage(deep=True).sum())
+
+    with _uploads_lock:
+        _uploads[key] = (df, size, report)
+        total = sum(entry[1] for entry in _uploads.values())
+        while len(_uploads) > 1 and (len(_uploads) > MAX_CACHED_UPLOADS or total > MAX_CACHED_BYTES):
+            _, evicted = _uploads.popitem(last=False)
+            total -= evicted[1]
+    return df.copy(deep=False)
+
+
+def upload_report(uploaded_file, schema=None, encoding='utf-8', compact=True):
+    """Returns the CompactReport of a cached upload, or None if it was not compacted or has been evicted."""
+    key = _upload_key(uploaded_file.getvalue(), schema, encoding, compact)
+    with _uploads_lock:
+        entry = _uploads.get(key)
+    return entry[2] if entry else None
@@ -0,0 +1,236 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MAX_CACHED_RESULTS = 16
+AGE_BINS = [0, 18, 25, 35, 50, 65, 100]
+AGE_LABELS = ['<18', '18-25', '26-35', '36-50', '51-65', '65+']
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+BAKERY_KPI_COLUMNS = {
+    'date': 'Order Date', 'product': 'Product Name', 'quantity': 'Quantity Sold', 'price': 'Price',
+    'rating': 'Review Rating', 'payment': 'Payment Method', 'segment': 'Customer Segment',
+    'gender': 'Customer Gender', 'discount': 'Discount Applied', 'age': 'Customer Age',
+}
+
+CLOTHING_KPI_COLUMNS = {
+    'date': 'Date', 'product': 'Product', 'quantity': 'Quantity', 'price': 'Price',
+    'rating': 'Review Rating (out of 5)', 'payment': 'Payment Method', 'segment': 'Customer Segment',
+    'gender': 'Gender', 'discount': 'Discount Applied', 'age': 'Age',
+}
+
+GIFTS_KPI_COLUMNS = {
+    **BAKERY_KPI_COLUMNS,
+    'shipping_time': 'Shipping Time', 'return_rate': 'Return Rate', 'cac': 'CAC', 'cltv': 'CLTV',
+}
+
+_results = OrderedDict()
+_results_lock = threading.Lock()
+
+
+def _sum_by(keys, weights, name=None):
+    """Sums weights per distinct key with one factorize and one bincount.
+
+    Categorical keys use their codes directly, and the result is indexed
+    by plain labels, so folds of chunks with different categories align.
+    """
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        codes = keys.cat.codes.to_numpy()
+        valid = codes >= 0
+        size = len(keys.cat.categories)
+        sums = np.bincount(codes[valid], weights=weights[valid], minlength=size)
+        observed = np.bincount(codes[valid], minlength=size) > 0
+        labels = np.asarray(keys.cat.categories)[observed]
+        return pd.Series(sums[observed], index=pd.Index(labels, name=name)).sort_index()
+
+    codes, uniques = pd.factorize(keys, sort=True)
+    valid = codes >= 0
+    sums = np.bincount(codes[valid], weights=weights[valid], minlength=len(uniques))
+    return pd.Series(sums, index=pd.Index(uniques, name=name))
+
+
+def _cache_key(df, columns):
+    used = [column for column in columns.values() if column in df.columns]
+    hashed = pd.util.hash_pandas_object(df[used], index=False).to_numpy()
+    return hashlib.sha256(hashed.tobytes() + repr(sorted(columns.items())).encode()).hexdigest()
+
+
+class KPIAccumulator:
+    """Running KPI aggregates that sales frames are folded into one chunk at a time.
+
+    Only per-key sums and counts are kept, so memory is bounded by the
+    number of distinct products, segments and days rather than by rows.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.total_revenue = 0.0
+        self.total_units = 0.0
+        self.rating_sum = 0.0
+        self.rating_count = 0
+        self.age_revenue = np.zeros(len(AGE_LABELS))
+        self.sums = {}
+        self.present = set()
+
+    def _fold(self, name, sums):
+        previous = self.sums.get(name)
+        self.sums[name] = sums if previous is None else previous.add(sums, fill_value=0)
+
+    def add(self, df):
+        """Folds one frame into the aggregates and returns self."""
+        columns = self.columns
+        present = {role for role, column in columns.items() if column in df.columns}
+        self.present |= present
+
+        quantity = df[columns['quantity']].to_numpy(dtype=float)
+        revenue = np.nan_to_num(quantity * df[columns['price']].to_numpy(dtype=float))
+        self.total_revenue += revenue.sum()
+        self.total_units += np.nansum(quantity)
+
+        if 'rating' in present:
+            ratings = df[columns['rating']].to_numpy(dtype=float)
+            self.rating_sum += np.nansum(ratings)
+            self.rating_count += int(np.count_nonzero(~np.isnan(ratings)))
+        if 'payment' in present:
+            self._fold('payment', _sum_by(df[columns['payment']], np.ones(len(df)), columns['payment']))
+        for role in ('product', 'segment', 'gender', 'discount', 'shipping_time', 'return_rate'):
+            if role in present:
+                self._fold(role, _sum_by(df[columns[role]], revenue, columns[role]))
+
+        if 'age' in present:
+            age_groups = pd.cut(df[columns['age']], bins=AGE_BINS, labels=AGE_LABELS)
+            codes = age_groups.cat.codes.to_numpy()
+            self.age_revenue += np.bincount(codes[codes >= 0], weights=revenue[codes >= 0], minlength=len(AGE_LABELS))
+
+        if 'date' in present:
+            self._fold('date', _sum_by(df[columns['date']].dt.normalize(), revenue, columns['date']))
+
+        if {'segment', 'cac', 'cltv'} <= present:
+            segments = df[columns['segment']]
+            for role in ('cac', 'cltv'):
+                values = df[columns[role]].to_numpy(dtype=float)
+                seen = ~np.isnan(values)
+                self._fold(f'{role}_sum', _sum_by(segments, np.where(seen, values, 0), columns['segment']))
+                self._fold(f'{role}_count', _sum_by(segments, seen.astype(float), columns['segment']))
+        return self
+
+    def result(self):
+        """Returns the KPI dict in the shape compute_kpis produces."""
+        columns, sums = self.columns, self.sums
+        kpis = {
+            'total_revenue': self.total_revenue,
+            'total_units': self.total_units,
+            'avg_rating': self.rating_sum / self.rating_count if self.rating_count else float('nan'),
+        }
+
+        if 'product' in sums:
+            kpis['top_products'] = sums['product'].sort_values(ascending=False).head(10)
+        if 'payment' in sums:
+            kpis['payment_counts'] = sums['payment'].astype('int64').sort_values(ascending=False).rename('count')
+        for role in ('segment', 'gender', 'discount', 'shipping_time', 'return_rate'):
+            if role in sums:
+                kpis[f'{role}_revenue'] = sums[role]
+
+        if 'age' in self.present:
+            kpis['age_revenue'] = pd.Series(self.age_revenue, index=pd.Index(AGE_LABELS, name='Age Group'))
+
+        if 'date' in sums:
+            daily = sums['date'].sort_index()
+            kpis['daily_revenue'] = daily
+            months = daily.index.year * 12 + daily.index.month
+            kpis['avg_monthly_revenue'] = daily.groupby(months).sum().mean()
+
+            weekdays = daily.groupby(daily.index.dayofweek).sum()
+            weekday = pd.Series(weekdays.to_numpy(), index=pd.Index(np.asarray(WEEKDAYS)[weekdays.index], name=columns['date']))
+            kpis['weekday_revenue'] = weekday.sort_values()
+
+        if 'cac_sum' in sums:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                kpis['cac_cltv'] = pd.DataFrame({
+                    columns['cac']: sums['cac_sum'] / sums['cac_count'],
+                    columns['cltv']: sums['cltv_sum'] / sums['cltv_count'],
+                })
+        return kpis
+
+
+def _memoized(key, compute):
+    with _results_lock:
+        if key in _results:
+            _results.move_to_end(key)
+            return _results[key]
+
+    kpis = compute()
+
+    with _results_lock:
+        _results[key] = kpis
+        while len(_results) > MAX_CACHED_RESULTS:
+            _results.popitem(last=False)
+    return kpis
+
+
+def compute_kpis(df, columns, cache_key=None):
+    """Computes every KPI breakdown the analysis pages chart and summarize.
+
+    `columns` maps roles (date, product, quantity, ...) to the dataset's
+    column names; roles whose column is missing are skipped. Each
+    breakdown is one factorize plus a bincount over the revenue array, and
+    results are memoized per dataset.
+    """
+    key = (cache_key, repr(sorted(columns.items()))) if cache_key else _cache_key(df, columns)
+    return _memoized(key, lambda: KPIAccumulator(columns).add(df).result())
+
+
+def compute_kpis_chunked(chunks, columns, cache_key=None):
+    """Computes the same KPIs as compute_kpis from an iterable of frames.
+
+    Each chunk is folded into a KPIAccumulator and dropped, so peak memory
+    is set by the chunk size. Results are memoized only when `cache_key`
+    is given, since the chunks cannot be hashed without reading them.
+    """
+    def compute():
+        accumulator = KPIAccumulator(columns)
+        for chunk in chunks:
+            accumulator.add(chunk)
+        return accumulator.result()
+
+    if cache_key is None:
+        return compute()
+    return _memoized((cache_key, repr(sorted(columns.items()))), compute)
+
+
+def performance_summary(kpis):
+    """Formats the KPI bullet list used in the AI suggestion prompts."""
+    lines = [
+        f"- Total Revenue: ₹{kpis['total_revenue']:,.0f}",
+        f"- Total Units Sold: {kpis['total_units']:,.0f}",
+        f"- Average Review Rating: {kpis['avg_rating']:.2f}",
+    ]
+    if 'top_products' in kpis:
+        lines.append(f"- Top 3 Products: {', '.join(map(str, kpis['top_products'].index[:3]))}")
+    if 'payment_counts' in kpis:
+        lines.append(f"- Most Used Payment Method: {kpis['payment_counts'].idxmax()}")
+    if 'segment_revenue' in kpis:
+        seg_rev = kpis['segment_revenue']
+        lines.append(f"- Most Profitable Segment: {seg_rev.idxmax()} with ₹{seg_rev.max():,.0f}")
+    if 'gender_revenue' in kpis:
+        gender_rev = kpis['gender_revenue']
+        lines.append(f"- Gender with Highest Revenue: {gender_rev.idxmax()} with ₹{gender_rev.max():,.0f}")
+    if 'discount_revenue' in kpis:
+        discount_rev = kpis['discount_revenue']
+        lines.append(f"- Revenue from Discounts: ₹{discount_rev.get(True, 0):,.0f}")
+        lines.append(f"- Revenue without Discounts: ₹{discount_rev.get(False, 0):,.0f}")
+    if 'age_revenue' in kpis:
+        age_rev = kpis['age_revenue']
+        lines.append(f"- Best Performing Age Group: {age_rev.idxmax()} with ₹{age_rev.max():,.0f}")
+    if 'avg_monthly_revenue' in kpis:
+        lines.append(f"- Avg Monthly Revenue: ₹{kpis['avg_monthly_revenue']:,.0f}")
+    if 'shipping_time_revenue' in kpis:
+        lines.append(f"- Shipping Time vs Revenue: {kpis['shipping_time_revenue'].to_string()}")
+    if 'return_rate_revenue' in kpis:
+        lines.append(f"- Return Rate vs Revenue: {kpis['return_rate_revenue'].to_string()}")
+    if 'cac_cltv' in kpis:
+        lines.append(f"- CAC vs CLTV: {kpis['cac_cltv'].to_string()}")
+    return "\n".join(lines)
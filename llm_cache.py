@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+
+LLM_CACHE_PATH = os.environ.get('LLM_CACHE_PATH', '.llm_cache.sqlite3')
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+MAX_CACHED_RESPONSES = 2000
+MAX_CACHED_BYTES = 64 * 1024 * 1024
+
+
+def normalize_prompt(prompt):
+    """Collapses whitespace so re-indented but identical prompts share an entry."""
+    return re.sub(r'\s+', ' ', prompt).strip()
+
+
+def cache_key(provider, model, prompt, temperature=None):
+    payload = json.dumps([provider, model, normalize_prompt(prompt), temperature])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed store of LLM responses with TTL, count and size eviction."""
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl=DEFAULT_TTL_SECONDS,
+                 max_entries=MAX_CACHED_RESPONSES, max_bytes=MAX_CACHED_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        with self._connect() as db:
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                ' key TEXT PRIMARY KEY, provider TEXT, model TEXT, response TEXT,'
+                ' size INTEGER, created_at REAL, last_used REAL)'
+            )
+            db.execute('CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used)')
+
+    @contextmanager
+    def _connect(self):
+        """Opens a connection for one transaction and closes it afterwards."""
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            db.execute('PRAGMA journal_mode=WAL')
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def get(self, provider, model, prompt, temperature=None):
+        """Returns the cached response, or None when missing, expired or empty."""
+        key = cache_key(provider, model, prompt, temperature)
+        now = time.time()
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT response FROM responses WHERE key = ? AND created_at >= ? AND response != ''",
+                (key, now - self.ttl)
+            ).fetchone()
+            if row is not None:
+                db.execute('UPDATE responses SET last_used = ? WHERE key = ?', (now, key))
+        return row[0] if row else None
+
+    def put(self, provider, model, prompt, response, temperature=None):
+        key = cache_key(provider, model, prompt, temperature)
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, provider, model, response, len(response.encode()), now, now)
+            )
+            self._evict(db, now)
+
+    def _evict(self, db, now):
+        db.execute('DELETE FROM responses WHERE created_at < ?', (now - self.ttl,))
+        db.execute(
+            'DELETE FROM responses WHERE key IN ('
+            ' SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)',
+            (self.max_entries,)
+        )
+        total = db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total > self.max_bytes:
+            for key, size in db.execute('SELECT key, size FROM responses ORDER BY last_used').fetchall():
+                db.execute('DELETE FROM responses WHERE key = ?', (key,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+
+llm_cache = LLMCache()
+
+
+def cached_generate(provider, model, prompt, generate, temperature=None, bypass=False):
+    """Returns generate()'s text, serving identical earlier requests from the cache.
+
+    With `bypass`, the cache is not read but the fresh response still
+    replaces the stored one.
+    """
+    if not bypass:
+        cached = llm_cache.get(provider, model, prompt, temperature)
+        if cached is not None:
+            return cached
+
+    response = generate()
+    llm_cache.put(provider, model, prompt, response, temperature)
+    return response
+
+
+def gemini_generate(model, prompt, bypass=False):
+    """Runs model.generate_content(prompt) through the response cache."""
+    return cached_generate(
+        'gemini', model.model_name, prompt,
+        lambda: model.generate_content(prompt).text,
+        bypass=bypass,
+    )
+
+
+def gemini_stream(model, prompt, bypass=False):
+    """Yields response text as Gemini streams it, then stores the full text in the cache.
+
+    A cached response is yielded in one piece. Meant for st.write_stream,
+    which renders the chunks as they arrive and returns the joined text.
+    """
+    if not bypass:
+        cached = llm_cache.get('gemini', model.model_name, prompt)
+        if cached is not None:
+            yield cached
+            return
+
+    parts = []
+    for chunk in model.generate_content(prompt, stream=True):
+        try:
+            text = chunk.text
+        except ValueError:
+            # Chunks without text parts (e.g. safety metadata) carry nothing to render.
+            continue
+        parts.append(text)
+        yield text
+
+    # A blocked or empty response is not cached, as with gemini_generate.
+    response = ''.join(parts)
+    if response:
+        llm_cache.put('gemini', model.model_name, prompt, response)
@@ -0,0 +1,69 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+LLM_TIMEOUT_SECONDS = 90
+MAX_CONCURRENT_CALLS = 8
+
+# Shared across runs so a timed-out call never holds up asyncio.run's shutdown.
+_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_CALLS, thread_name_prefix='llm')
+
+
+class GenerationCancelled(Exception):
+    """Raised for calls abandoned because a newer run of the session started."""
+
+
+def _unless_cancelled(name, call, cancel_event):
+    """Wraps `call` so a queued call whose run was superseded never starts."""
+    def run():
+        if cancel_event is not None and cancel_event.is_set():
+            raise GenerationCancelled(name)
+        return call()
+    return run
+
+
+async def _run_calls(calls, timeout, cancel_event, on_progress):
+    loop = asyncio.get_running_loop()
+    tasks = {
+        asyncio.ensure_future(asyncio.wait_for(
+            loop.run_in_executor(_executor, _unless_cancelled(name, call, cancel_event)), timeout)): name
+        for name, call in calls.items()
+    }
+
+    pending = set(tasks)
+    while pending:
+        _, pending = await asyncio.wait(pending, timeout=0.2)
+        if on_progress is not None:
+            on_progress(len(tasks) - len(pending), len(tasks))
+        if cancel_event is not None and cancel_event.is_set():
+            for task in pending:
+                task.cancel()
+            break
+
+    results = {}
+    for task, name in tasks.items():
+        if task.cancelled() or not task.done():
+            results[name] = GenerationCancelled(name)
+            continue
+        error = task.exception()
+        if isinstance(error, asyncio.TimeoutError):
+            results[name] = TimeoutError(f"{name} did not finish within {timeout}s")
+        else:
+            results[name] = error if error is not None else task.result()
+    return {name: results[name] for name in calls}
+
+
+def run_llm_calls(calls, timeout=LLM_TIMEOUT_SECONDS, cancel_event=None, on_progress=None):
+    """Runs independent blocking LLM calls concurrently.
+
+    `calls` maps a name to a zero-argument callable. The result maps each
+    name to its return value, or to the exception it raised, a
+    TimeoutError, or GenerationCancelled once `cancel_event` is set.
+
+    `on_progress(done, total)` is called from the caller's thread while
+    waiting. In Streamlit, updating an element there lets a session rerun
+    interrupt the wait, which cancels every outstanding call. Calls already
+    running finish in the background and their results are dropped; calls
+    still queued when `cancel_event` is set are skipped, so a page should
+    keep one event per session and set it when the next run starts.
+    """
+    return asyncio.run(_run_calls(calls, timeout, cancel_event, on_progress))
@@ -0,0 +1,187 @@
+"""Load-test harness for the Flask app in app.py.
+
+Starts the app on a local port against a temporary database, seeds users,
+drives mixed register/login/options/dashboard traffic from concurrent
+clients and prints per-route throughput and latency percentiles as JSON:
+
+    python loadtest.py --users 200 --clients 16 --duration 30 --output results.json
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import random
+import secrets
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from werkzeug.serving import make_server
+
+DEFAULT_MIX = 'login=3,options=4,dashboard=2,register=1'
+SEED_PASSWORD = 'loadtest-password'
+
+
+def parse_mix(text):
+    weights = {}
+    for part in text.split(','):
+        route, weight = part.split('=')
+        weights[route.strip()] = float(weight)
+    return weights
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def start_app(database):
+    """Imports app.py against `database` and serves it on a free local port."""
+    os.environ['DATABASE'] = database
+    # The throwaway server only needs some key to sign sessions with.
+    os.environ.setdefault('SECRET_KEY', secrets.token_hex(32))
+    import app as flask_app
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    if not os.path.isdir(os.path.join(here, 'templates')):
+        # The HTML pages live next to app.py in this checkout.
+        flask_app.app.template_folder = here
+
+    flask_app.init_db()
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, flask_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return flask_app, server
+
+
+def seed_users(flask_app, count):
+    """Inserts `count` users sharing one precomputed hash, so seeding stays fast."""
+    password_hash = flask_app.hasher.hash(SEED_PASSWORD)
+    with flask_app.app.app_context():
+        db = flask_app.get_db()
+        db.executemany(
+            'INSERT INTO users (username, password_hash) VALUES (?, ?)',
+            [(f'seed{i}', password_hash) for i in range(count)]
+        )
+        db.commit()
+    return [f'seed{i}' for i in range(count)]
+
+
+class Client:
+    def __init__(self, base_url, usernames, new_user_ids):
+        self.base_url = base_url
+        self.usernames = usernames
+        self.new_user_ids = new_user_ids
+        self.session = requests.Session()
+
+    def login(self):
+        return self.session.post(f'{self.base_url}/login', data={
+            'username': random.choice(self.usernames), 'password': SEED_PASSWORD,
+        }, allow_redirects=False)
+
+    def register(self):
+        username = f'new{next(self.new_user_ids)}'
+        return self.session.post(f'{self.base_url}/register', data={
+            'new_username': username, 'new_password': SEED_PASSWORD, 'confirm_password': SEED_PASSWORD,
+        }, allow_redirects=False)
+
+    def options(self):
+        return self.session.get(f'{self.base_url}/options/', allow_redirects=False)
+
+    def dashboard(self):
+        return self.session.get(f'{self.base_url}/dashboard', allow_redirects=False)
+
+
+def run_client(client, routes, weights, deadline, samples, lock):
+    client.login()
+    while time.perf_counter() < deadline:
+        route = random.choices(routes, weights)[0]
+        start = time.perf_counter()
+        try:
+            status = getattr(client, route)().status_code
+        except requests.RequestException:
+            status = None
+        elapsed = time.perf_counter() - start
+        with lock:
+            samples[route].append((elapsed, status))
+
+
+def summarize(samples, duration):
+    report = {}
+    for route, entries in sorted(samples.items()):
+        latencies = sorted(elapsed * 1000 for elapsed, _ in entries)
+        errors = sum(1 for _, status in entries if status is None or status >= 500)
+        report[route] = {
+            'requests': len(entries),
+            'errors': errors,
+            'throughput_rps': round(len(entries) / duration, 2),
+            'p50_ms': round(percentile(latencies, 0.50), 2) if latencies else None,
+            'p95_ms': round(percentile(latencies, 0.95), 2) if latencies else None,
+            'p99_ms': round(percentile(latencies, 0.99), 2) if latencies else None,
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=100, help='users to seed before the run')
+    parser.add_argument('--clients', type=int, default=8, help='concurrent client sessions')
+    parser.add_argument('--duration', type=float, default=20, help='seconds of traffic')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='route weights, e.g. %(default)s')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    args = parser.parse_args(argv)
+
+    weights = parse_mix(args.mix)
+    routes = list(weights)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        flask_app, server = start_app(os.path.join(tmp, 'loadtest.db'))
+        try:
+            usernames = seed_users(flask_app, args.users)
+            base_url = f'http://127.0.0.1:{server.server_port}'
+            new_user_ids = itertools.count()
+            samples = defaultdict(list)
+            lock = threading.Lock()
+
+            started = time.perf_counter()
+            deadline = started + args.duration
+            with ThreadPoolExecutor(max_workers=args.clients) as pool:
+                futures = [
+                    pool.submit(run_client, Client(base_url, usernames, new_user_ids), routes,
+                                [weights[r] for r in routes], deadline, samples, lock)
+                    for _ in range(args.clients)
+                ]
+            elapsed = time.perf_counter() - started
+            client_errors = []
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    # A client that died stopped sending traffic; report it rather than under-count silently.
+                    client_errors.append(f'{type(e).__name__}: {e}')
+        finally:
+            server.shutdown()
+
+    report = {
+        'config': {'users': args.users, 'clients': args.clients, 'duration_s': round(elapsed, 2), 'mix': weights},
+        'routes': summarize(samples, elapsed),
+        'client_failures': len(client_errors),
+        'client_errors': client_errors,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,16 +1,29 @@
+from startup_profile import page_profile
+profile = page_profile("newww")
+
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import google.generativeai as genai
+
+from dataset_store import SAVE_FAILED_MESSAGE, get_store, remember_upload
+from ingestion import (
+    GIFTS_SCHEMA, STREAMING_THRESHOLD_BYTES, iter_csv_chunks, load_upload, read_preview,
+    upload_digest, upload_report,
+)
+from kpi import GIFTS_KPI_COLUMNS, compute_kpis, compute_kpis_chunked, performance_summary
+from llm_cache import gemini_stream
+from user_tokens import user_from_token
+
+profile.mark("imports")
 
 google_api_key = st.secrets["api_keys"]["google_api"]
 st.set_page_config(page_title="AI-Powered Personalized Gift Analysis", layout="wide")
 st.title("🎁 AI-Powered Personalized Gift Analysis")
 
 uploaded_file = st.file_uploader("Upload your sales CSV file", type="csv")
+user_id = user_from_token(st.query_params.get("token"))
+saved = get_store().info(user_id, GIFTS_SCHEMA.name) if user_id is not None else None
 
 business_type = st.selectbox("Select your business type", ["Personalized Gifts"])
+profile.finish("first render")
 
 required_columns = [
     "Order ID", "Order Date", "Quantity Sold", "Product Name", "Price", "Customer ID", 
@@ -26,65 +39,77 @@ You are a business advisor helping a personalized gift shop owner. Based on the
 3. Suggest 2-3 creative, actionable ideas to improve sales on slow days. Also, analyze uncertainties and give practical suggestions.
 """
 
-if uploaded_file:
+if uploaded_file or saved:
     try:
-        df = pd.read_csv(uploaded_file, parse_dates=['Order Date'])
+        memory = None
+        streaming = uploaded_file is not None and st.sidebar.checkbox(
+            "Streaming mode (large files)", value=uploaded_file.size > STREAMING_THRESHOLD_BYTES
+        )
+        if not uploaded_file:
+            st.caption(f"Using your saved dataset ({saved['row_count']:,} rows). Upload a file to replace it.")
+            preview = get_store().head(user_id, GIFTS_SCHEMA.name)
+        elif streaming:
+            preview = read_preview(uploaded_file, GIFTS_SCHEMA)
+        else:
+            df = load_upload(uploaded_file, GIFTS_SCHEMA)
+            memory = upload_report(uploaded_file, GIFTS_SCHEMA)
+            preview = df.head()
         
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        missing_columns = [col for col in required_columns if col not in preview.columns]
         
         if missing_columns:
             st.error(f"⚠️ Missing columns: {', '.join(missing_columns)}. Please upload a CSV file with the required columns.")
         else:
-            df['Revenue'] = df['Quantity Sold'] * df['Price']
-            df['Month'] = df['Order Date'].dt.to_period("M").astype(str)
+            if not uploaded_file:
+                chunks = get_store().iter_frames(user_id, GIFTS_SCHEMA.name, columns=GIFTS_KPI_COLUMNS.values())
+                kpis = compute_kpis_chunked(chunks, GIFTS_KPI_COLUMNS, cache_key=saved['digest'])
+            elif streaming:
+                chunks = iter_csv_chunks(uploaded_file, GIFTS_SCHEMA, usecols=GIFTS_KPI_COLUMNS.values())
+                kpis = compute_kpis_chunked(chunks, GIFTS_KPI_COLUMNS, cache_key=upload_digest(uploaded_file))
+                if not remember_upload(user_id, uploaded_file, GIFTS_SCHEMA, streaming=True):
+                    st.warning(SAVE_FAILED_MESSAGE)
+            else:
+                kpis = compute_kpis(df, GIFTS_KPI_COLUMNS, cache_key=upload_digest(uploaded_file))
+                if not remember_upload(user_id, uploaded_file, GIFTS_SCHEMA):
+                    st.warning(SAVE_FAILED_MESSAGE)
 
             with st.expander("🔍 Preview Data"):
-                st.dataframe(df.head())
+                st.dataframe(preview)
+                if memory:
+                    st.caption(f"Loaded compactly: {memory}")
 
             st.subheader("📈 Summary Metrics")
             col1, col2, col3 = st.columns(3)
-            col1.metric("Total Revenue", f"₹{df['Revenue'].sum():,.0f}")
-            col2.metric("Total Units Sold", f"{df['Quantity Sold'].sum():,.0f}")
-            col3.metric("Average Rating", f"{df['Review Rating'].mean():.2f} ⭐")
+            col1.metric("Total Revenue", f"₹{kpis['total_revenue']:,.0f}")
+            col2.metric("Total Units Sold", f"{kpis['total_units']:,.0f}")
+            col3.metric("Average Rating", f"{kpis['avg_rating']:.2f} ⭐")
 
             st.subheader("🏆 Top 10 Products by Revenue")
-            top_products = df.groupby('Product Name')['Revenue'].sum().sort_values(ascending=False).head(10)
-            st.bar_chart(top_products)
+            st.bar_chart(kpis['top_products'])
 
             st.subheader("💳 Payment Method Distribution")
-            payment_counts = df['Payment Method'].value_counts()
-            st.bar_chart(payment_counts)
+            st.bar_chart(kpis['payment_counts'])
 
             st.subheader("👥 Revenue by Customer Segment")
-            seg_rev = df.groupby('Customer Segment')['Revenue'].sum()
-            st.bar_chart(seg_rev)
+            st.bar_chart(kpis['segment_revenue'])
 
             st.subheader("🚻 Revenue by Gender")
-            gender_rev = df.groupby('Customer Gender')['Revenue'].sum()
-            st.bar_chart(gender_rev)
+            st.bar_chart(kpis['gender_revenue'])
 
             st.subheader("💸 Revenue with and without Discount")
-            discount_rev = df.groupby('Discount Applied')['Revenue'].sum()
-            st.bar_chart(discount_rev)
+            st.bar_chart(kpis['discount_revenue'])
 
             st.subheader("📊 Revenue by Age Group")
-            bins = [0, 18, 25, 35, 50, 65, 100]
-            labels = ['<18', '18-25', '26-35', '36-50', '51-65', '65+']
-            df['Age Group'] = pd.cut(df['Customer Age'], bins=bins, labels=labels)
-            age_rev = df.groupby('Age Group')['Revenue'].sum()
-            st.bar_chart(age_rev)
+            st.bar_chart(kpis['age_revenue'])
 
             st.subheader("📦 Shipping Time vs. Revenue")
-            shipping_time_rev = df.groupby('Shipping Time')['Revenue'].sum()
-            st.bar_chart(shipping_time_rev)
+            st.bar_chart(kpis['shipping_time_revenue'])
 
             st.subheader("📉 Return Rate vs. Revenue")
-            return_rate_rev = df.groupby('Return Rate')['Revenue'].sum()
-            st.bar_chart(return_rate_rev)
+            st.bar_chart(kpis['return_rate_revenue'])
 
             st.subheader("💡 CAC vs. CLTV")
-            cac_cltv = df.groupby('Customer Segment')[['CAC', 'CLTV']].mean()
-            st.bar_chart(cac_cltv)
+            st.bar_chart(kpis['cac_cltv'])
 
             st.subheader("🧠 AI Suggestions for Growth")
 
@@ -95,32 +120,19 @@ if uploaded_file:
             3. Suggest 2-3 creative, actionable ideas to improve sales on slow days. Also, analyze uncertainties and give practical suggestions.
 
             Performance Summary:
-            - Total Revenue: ₹{df['Revenue'].sum():,.0f}
-            - Total Units Sold: {df['Quantity Sold'].sum():,.0f}
-            - Average Review Rating: {df['Review Rating'].mean():.2f}
-            - Top 3 Products: {', '.join(top_products.index[:3])}
-            - Most Used Payment Method: {payment_counts.idxmax()}
-            - Most Profitable Segment: {seg_rev.idxmax()} with ₹{seg_rev.max():,.0f}
-            - Gender with Highest Revenue: {gender_rev.idxmax()} with ₹{gender_rev.max():,.0f}
-            - Revenue from Discounts: ₹{discount_rev.get(True, 0):,.0f}
-            - Revenue without Discounts: ₹{discount_rev.get(False, 0):,.0f}
-            - Best Performing Age Group: {age_rev.idxmax()} with ₹{age_rev.max():,.0f}
-            - Avg Monthly Revenue: ₹{df.groupby('Month')['Revenue'].sum().mean():,.0f}
-            - Shipping Time vs Revenue: {shipping_time_rev.to_string()}
-            - Return Rate vs Revenue: {return_rate_rev.to_string()}
-            - CAC vs CLTV: {cac_cltv.to_string()}
+            {performance_summary(kpis)}
 
             Daily Revenue Breakdown:
-            {df.groupby(df['Order Date'].dt.day_name())['Revenue'].sum().sort_values().to_string()}
+            {kpis['weekday_revenue'].to_string()}
             """
 
             # 🔍 Generate AI Suggestions
+            import google.generativeai as genai
+
             model = genai.GenerativeModel('gemini-2.0-flash-thinking-exp')
-            with st.spinner("Getting AI-generated suggestions..."):
-                response = model.generate_content(summary_text)
-                st.success("Here's what the AI recommends:")
-                st.markdown(response.text)
-                st.download_button("💾 Download Suggestions", response.text, file_name="Business_AI_Insights.txt")
+            st.success("Here's what the AI recommends:")
+            response_text = st.write_stream(gemini_stream(model, summary_text))
+            st.download_button("💾 Download Suggestions", response_text, file_name="Business_AI_Insights.txt")
 
     except Exception as e:
         st.error(f"⚠️ An error occurred while processing the file: {e}")
@@ -0,0 +1,78 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+MAX_PENDING_HASHES = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 32))
+HASH_TIMEOUT_SECONDS = 30
+
+logger = logging.getLogger(__name__)
+
+
+class HashingBusy(Exception):
+    """Raised when too many hashes are queued or one times out; the caller should ask the user to retry."""
+
+
+class PasswordHasher:
+    """Runs password hashing on a small dedicated pool with a bounded queue.
+
+    At most `workers` hashes run at once, so a burst of logins cannot take
+    every request thread's CPU. Once `max_pending` hashes are running or
+    queued, new work is refused with HashingBusy instead of piling up.
+    """
+
+    def __init__(self, method=PASSWORD_HASH_METHOD, workers=HASH_WORKERS, max_pending=MAX_PENDING_HASHES):
+        self.method = method
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._method_prefix = None
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _run(self, fn, *args):
+        future = self._submit(fn, *args)
+        try:
+            return future.result(HASH_TIMEOUT_SECONDS)
+        except FutureTimeout:
+            # Still queued behind slow hashes; drop it rather than run it for nobody.
+            future.cancel()
+            raise HashingBusy() from None
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when the stored hash was made with different parameters than the configured ones."""
+        if self._method_prefix is None:
+            # Werkzeug fills in default parameters, so compare against a real hash's prefix.
+            self._method_prefix = generate_password_hash('', self.method).split('$', 1)[0]
+        return password_hash.split('$', 1)[0] != self._method_prefix
+
+    def rehash_later(self, password, store):
+        """Hashes password with the current parameters in the background and passes it to store().
+
+        Skipped when the pool is saturated; the next login tries again.
+        Failures are logged, since nobody waits on the result.
+        """
+        def rehash():
+            try:
+                store(generate_password_hash(password, self.method))
+            except Exception:
+                logger.exception('Could not store a rehashed password')
+
+        try:
+            self._submit(rehash)
+        except HashingBusy:
+            pass
@@ -0,0 +1,106 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+MAX_CACHED_AGGREGATIONS = 8
+
+_aggregations = OrderedDict()
+_aggregations_lock = threading.Lock()
+
+
+class SeriesMatrix:
+    """Dense, date-aligned daily totals per category for one or more value columns."""
+
+    def __init__(self, frames, row_counts, active_days):
+        self.frames = frames
+        self.row_counts = row_counts
+        self.active_days = active_days
+
+    @property
+    def categories(self):
+        return list(self.row_counts.index)
+
+    def history(self, column, category):
+        """Returns the ds/y frame Prophet expects for one category."""
+        series = self.frames[column][category]
+        return pd.DataFrame({'ds': series.index, 'y': series.to_numpy()})
+
+    def histories(self, column, categories):
+        return [self.history(column, category) for category in categories]
+
+    def total(self, column):
+        """Returns the ds/y frame of daily totals across all categories."""
+        series = self.frames[column].sum(axis=1)
+        return pd.DataFrame({'ds': series.index, 'y': series.to_numpy()})
+
+
+def _aggregate(df, date_col, category_col, value_cols):
+    aggregations = {column: (column, 'sum') for column in value_cols}
+    return df.groupby([date_col, category_col], observed=True).agg(
+        **aggregations, _rows=(date_col, 'size')
+    )
+
+
+def _digest(row_hashes):
+    return hashlib.sha256(row_hashes.tobytes()).hexdigest()
+
+
+def _aggregate_incrementally(df, date_col, category_col, value_cols):
+    """Reuses the aggregation of an earlier upload that df extends with appended rows.
+
+    Rows are compared by position, so an upload that is the previous file
+    plus new rows at the end only aggregates the new tail.
+    """
+    signature = (date_col, category_col, tuple(value_cols))
+    row_hashes = pd.util.hash_pandas_object(
+        df[[date_col, category_col, *value_cols]], index=False
+    ).to_numpy()
+    digest = _digest(row_hashes)
+
+    with _aggregations_lock:
+        entries = [(key, value) for key, value in _aggregations.items() if key[0] == signature]
+
+    grouped = None
+    for key, (n_rows, previous) in reversed(entries):
+        if key[1] == digest:
+            grouped = previous
+            break
+        if n_rows < len(df) and _digest(row_hashes[:n_rows]) == key[1]:
+            tail = _aggregate(df.iloc[n_rows:], date_col, category_col, value_cols)
+            grouped = previous.add(tail, fill_value=0).astype(previous.dtypes.to_dict())
+            break
+
+    if grouped is None:
+        grouped = _aggregate(df, date_col, category_col, value_cols)
+
+    with _aggregations_lock:
+        _aggregations[(signature, digest)] = (len(df), grouped)
+        _aggregations.move_to_end((signature, digest))
+        while len(_aggregations) > MAX_CACHED_AGGREGATIONS:
+            _aggregations.popitem(last=False)
+    return grouped
+
+
+def build_series_matrix(df, date_col, category_col, value_cols, incremental=True):
+    """Aggregates df once over (date, category) into a SeriesMatrix.
+
+    Every value column becomes a dates x categories frame on a contiguous
+    daily index, with days that had no sales filled with zero. With
+    `incremental`, an upload that appends rows to a recently seen one only
+    aggregates the appended rows.
+    """
+    if incremental:
+        grouped = _aggregate_incrementally(df, date_col, category_col, value_cols)
+    else:
+        grouped = _aggregate(df, date_col, category_col, value_cols)
+    wide = grouped.unstack(category_col, fill_value=0)
+
+    days = pd.date_range(wide.index.min(), wide.index.max(), freq='D')
+    wide = wide.reindex(days, fill_value=0)
+    wide.index.name = date_col
+
+    rows = wide['_rows']
+    frames = {column: wide[column] for column in value_cols}
+    return SeriesMatrix(frames, rows.sum(), (rows > 0).sum())
@@ -0,0 +1,123 @@
+"""Startup-time profiling for the Streamlit pages.
+
+In a page, import this module before anything else and mark the
+milestones:
+
+    from startup_profile import page_profile
+    profile = page_profile("forecc")
+    ...imports...
+    profile.mark("imports")
+    ...first widgets...
+    profile.finish("first render")
+
+With STARTUP_PROFILE=1 every script run appends one JSON line per page to
+STARTUP_PROFILE_LOG, recording the seconds to each mark and which heavy
+modules were already loaded there. Without it the calls are no-ops.
+
+Run as a script to time each page's top-level imports in a fresh
+interpreter, without starting Streamlit:
+
+    python startup_profile.py forecc.py analysis.py
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+import time
+
+PROFILE_ENABLED = os.environ.get('STARTUP_PROFILE', '') not in ('', '0')
+PROFILE_LOG = os.environ.get('STARTUP_PROFILE_LOG', 'startup_profile.jsonl')
+HEAVY_MODULES = ('prophet', 'cmdstanpy', 'matplotlib', 'seaborn', 'google.generativeai', 'altair')
+
+_seen_pages = set()
+
+
+class PageProfile:
+    """Timestamps for one run of a page script."""
+
+    def __init__(self, page):
+        self.page = page
+        self.cold = page not in _seen_pages
+        self.started = time.perf_counter()
+        self.marks = []
+        _seen_pages.add(page)
+
+    def mark(self, label):
+        if not PROFILE_ENABLED:
+            return
+        self.marks.append({
+            'label': label,
+            'seconds': round(time.perf_counter() - self.started, 4),
+            'heavy_modules': [name for name in HEAVY_MODULES if name in sys.modules],
+        })
+
+    def finish(self, label):
+        """Records the last mark and writes the run's report."""
+        self.mark(label)
+        if not PROFILE_ENABLED:
+            return
+        record = {'page': self.page, 'cold': self.cold, 'time': time.time(), 'marks': self.marks}
+        print(f"[startup] {self.page} ({'cold' if self.cold else 'warm'}): " + ', '.join(
+            f"{mark['label']} {mark['seconds'] * 1000:.0f}ms" for mark in self.marks
+        ), file=sys.stderr)
+        try:
+            with open(PROFILE_LOG, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+        except OSError:
+            pass
+
+
+def page_profile(page):
+    return PageProfile(page)
+
+
+def page_imports(path):
+    """Lists the import statements at the top level of a page, in order."""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+_TIMER = """
+import json, sys, time
+timings = []
+for statement in json.loads(sys.argv[1]):
+    started = time.perf_counter()
+    try:
+        exec(statement, {})
+        error = None
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+    timings.append({'statement': statement, 'seconds': time.perf_counter() - started, 'error': error})
+print(json.dumps(timings))
+"""
+
+
+def time_imports(path):
+    """Times each top-level import of a page in a fresh interpreter."""
+    statements = page_imports(path)
+    result = subprocess.run(
+        [sys.executable, '-c', _TIMER, json.dumps(statements)],
+        cwd=os.path.dirname(os.path.abspath(path)), capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the cold imports of Streamlit pages.')
+    parser.add_argument('pages', nargs='+')
+    args = parser.parse_args()
+
+    for page in args.pages:
+        timings = time_imports(page)
+        total = sum(timing['seconds'] for timing in timings)
+        print(f'{page}: {total * 1000:.0f}ms')
+        for timing in sorted(timings, key=lambda timing: -timing['seconds']):
+            note = f"  ({timing['error']})" if timing['error'] else ''
+            print(f"  {timing['seconds'] * 1000:8.1f}ms  {timing['statement']}{note}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+"""Vectorized synthetic sales data for the bakery, gifts and clothing layouts.
+
+Rows are generated with NumPy in chunks and streamed to CSV, so
+benchmark files with tens of millions of rows never sit in memory at once.
+Formatting the CSV, not generating rows, dominates the run time, so chunks
+are rendered to bytes column by column instead of through DataFrame.to_csv:
+
+    python synthetic_data.py bakery 10000000 bakery_10m.csv --seed 7
+"""
+import argparse
+import itertools
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+DEFAULT_DAYS = {'bakery': 15, 'gifts': 120, 'clothing': 365}
+WRITE_BLOCK_ROWS = 20_000
+
+BAKERY_PRODUCTS = ["Chocolate Cake", "Vanilla Cupcake", "Fruit Tart", "Brownie", "Muffin", "Croissant", "Cheese Pastry", "Sourdough"]
+BAKERY_CATEGORIES = ["Cakes", "Cupcakes", "Tarts", "Baked Goods", "Pastries", "Pastries", "Baked Goods", "Cakes"]
+BAKERY_INGREDIENTS = ["Flour", "Sugar", "Butter", "Eggs", "Milk", "Baking Powder", "Cocoa"]
+BAKERY_SEGMENTS = ["Individual", "Family", "Business"]
+BAKERY_GENDERS = ["Male", "Female", "Other"]
+BAKERY_PAYMENT_METHODS = ["Credit Card", "Debit Card", "Cash", "UPI"]
+BAKERY_ORDER_TYPES = ["Single", "Bulk"]
+BAKERY_PACKAGING = ["Paper Box", "Plastic Wrap", "Cloth Bag"]
+
+GIFT_PRODUCTS = ["Custom Mug", "Custom Phone Case", "Engraved Jewelry", "Personalized T-shirt", "Photo Album"]
+GIFT_CATEGORIES = ["Accessories", "Jewelry", "Mugs", "T-shirts"]
+GIFT_GENDERS = ["Male", "Female", "Other"]
+GIFT_SEGMENTS = ["New", "Returning", "VIP"]
+GIFT_PAYMENT_METHODS = ["Cash on Delivery", "Credit Card", "Debit Card", "UPI"]
+
+CLOTHING_PRODUCTS = {
+    "T-Shirt": "Tops", "Blouse": "Tops", "Tank Top": "Tops", "Sweater": "Tops",
+    "Jeans": "Bottoms", "Shorts": "Bottoms", "Skirt": "Bottoms",
+    "Dress": "One-piece", "Jacket": "Outerwear", "Hoodie": "Outerwear",
+}
+CLOTHING_PAYMENT_METHODS = ["Cash", "Credit Card", "Debit Card", "Net Banking", "UPI", "Wallet"]
+CLOTHING_GENDERS = ["Female", "Male", "Non-Binary", "Prefer Not to Say"]
+CLOTHING_SEGMENTS = ["First-time", "Loyal", "Occasional", "Regular"]
+
+# Every ordered pick of three distinct ingredients, matching random.sample(ingredients, 3).
+_INGREDIENT_PICKS = np.array([", ".join(p) for p in itertools.permutations(BAKERY_INGREDIENTS, 3)])
+_HEX_DIGITS = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+_UUID_HEX_POSITIONS = np.array([i for i in range(36) if i not in (8, 13, 18, 23)])
+
+
+def _pick(rng, values, n):
+    """Draws n values as a Categorical, which skips building one string object per row."""
+    categories = pd.unique(np.asarray(values))
+    codes = pd.Index(categories).get_indexer(values)[rng.integers(0, len(values), n)]
+    return pd.Categorical.from_codes(codes, categories)
+
+
+def _dates(end, offsets):
+    """Formats `end - offsets` days as YYYY-MM-DD, rendering each distinct day once."""
+    low = int(offsets.min())
+    labels = np.datetime_as_string(end - np.arange(low, int(offsets.max()) + 1).astype('timedelta64[D]'), unit='D')
+    return pd.Categorical.from_codes(offsets - low, labels)
+
+
+def _uuid4_strings(rng, n):
+    """Builds n random version-4 UUID strings without a per-row Python loop."""
+    raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    digits = np.empty((n, 32), dtype=np.uint8)
+    digits[:, 0::2] = _HEX_DIGITS[raw >> 4]
+    digits[:, 1::2] = _HEX_DIGITS[raw & 0x0F]
+    text = np.full((n, 36), ord('-'), dtype=np.uint8)
+    text[:, _UUID_HEX_POSITIONS] = digits
+    return text.view('S36').ravel().astype(str)
+
+
+def bakery_chunk(rng, n, end, days, offset=0):
+    quantity = rng.integers(1, 4, n)
+    price = rng.integers(50, 301, n)
+    order_offsets = rng.integers(1, days + 1, n)
+    shelf_life = rng.integers(3, 7, n)
+    order_date = _dates(end, order_offsets)
+    return pd.DataFrame({
+        "Product Name": _pick(rng, BAKERY_PRODUCTS, n),
+        "Category": _pick(rng, BAKERY_CATEGORIES, n),
+        "Ingredients": pd.Categorical.from_codes(rng.integers(0, len(_INGREDIENT_PICKS), n), _INGREDIENT_PICKS),
+        "Quantity Sold": quantity,
+        "Price": price,
+        "Cost per Unit": np.round(price * 0.6, 2),
+        "Total Revenue": quantity * price,
+        "Discount Applied": rng.integers(0, 2, n).astype(bool),
+        "Customer Segment": _pick(rng, BAKERY_SEGMENTS, n),
+        "Order Date": order_date,
+        "Expiration Date": _dates(end, order_offsets - shelf_life),
+        "Shelf Life (Days)": shelf_life,
+        "Customer Age": rng.integers(18, 61, n),
+        "Customer Gender": _pick(rng, BAKERY_GENDERS, n),
+        "Payment Method": _pick(rng, BAKERY_PAYMENT_METHODS, n),
+        "Order Type": _pick(rng, BAKERY_ORDER_TYPES, n),
+        "Wastage Quantity": rng.integers(0, 3, n),
+        "Review Rating": np.round(rng.uniform(1, 5, n), 1),
+        "Packaging Type": _pick(rng, BAKERY_PACKAGING, n),
+        "When the Product Was Bought": order_date,
+    })
+
+
+def gifts_chunk(rng, n, end, days, offset=0):
+    return pd.DataFrame({
+        "Order ID": np.arange(offset, offset + n) + 1000,
+        "Order Date": _dates(end, rng.integers(0, days, n)),
+        "Quantity Sold": rng.integers(1, 11, n),
+        "Product Name": _pick(rng, GIFT_PRODUCTS, n),
+        "Price": rng.integers(100, 501, n),
+        "Customer ID": _uuid4_strings(rng, n),
+        "Customer Age": rng.integers(18, 66, n),
+        "Customer Gender": _pick(rng, GIFT_GENDERS, n),
+        "Customer Segment": _pick(rng, GIFT_SEGMENTS, n),
+        "Payment Method": _pick(rng, GIFT_PAYMENT_METHODS, n),
+        "Discount Applied": rng.integers(0, 2, n).astype(bool),
+        "Product Category": _pick(rng, GIFT_CATEGORIES, n),
+        "Review Rating": rng.integers(1, 6, n),
+        "Shipping Cost": rng.integers(30, 151, n),
+        "Shipping Time": rng.integers(2, 11, n),
+        "Return Rate": np.round(rng.uniform(0, 10, n), 2),
+        "CAC": rng.integers(100, 1000, n),
+        "CLTV": rng.integers(500, 5001, n),
+        "Repeat Purchase Rate": np.round(rng.uniform(0, 100, n), 2),
+    })
+
+
+def clothing_chunk(rng, n, end, days, offset=0):
+    products = _pick(rng, list(CLOTHING_PRODUCTS), n)
+    return pd.DataFrame({
+        "Date": _dates(end, rng.integers(0, days, n)),
+        "Product": products,
+        "Category": products.map(CLOTHING_PRODUCTS),
+        "Quantity": rng.integers(1, 21, n),
+        "Price": np.round(rng.uniform(10, 150, n), 2),
+        "Review Rating (out of 5)": np.round(rng.uniform(1, 5, n), 1),
+        "Payment Method": _pick(rng, CLOTHING_PAYMENT_METHODS, n),
+        "Age": rng.integers(18, 66, n),
+        "Gender": _pick(rng, CLOTHING_GENDERS, n),
+        "Discount Applied": rng.integers(0, 2, n).astype(bool),
+        "Customer Segment": _pick(rng, CLOTHING_SEGMENTS, n),
+    })
+
+
+GENERATORS = {'bakery': bakery_chunk, 'gifts': gifts_chunk, 'clothing': clothing_chunk}
+
+
+def generate(schema, rows, seed=0, chunk_size=DEFAULT_CHUNK_SIZE, days=None, end=None):
+    """Yields DataFrame chunks of synthetic rows for `schema`.
+
+    Dates fall within `days` days before `end` (today by default). For a
+    given seed and chunk size the output is reproducible.
+    """
+    make_chunk = GENERATORS[schema]
+    rng = np.random.default_rng(seed)
+    days = days or DEFAULT_DAYS[schema]
+    end = np.datetime64(end or 'today', 'D')
+    for offset in range(0, rows, chunk_size):
+        yield make_chunk(rng, min(chunk_size, rows - offset), end, days, offset)
+
+
+def _csv_label(value):
+    """Quotes one field the way csv.QUOTE_MINIMAL (and so to_csv) would."""
+    text = str(value)
+    if any(c in text for c in ',"\r\n'):
+        text = '"' + text.replace('"', '""') + '"'
+    return text.encode('utf-8')
+
+
+def _csv_field(values):
+    """Renders one column as a fixed-width bytes array, one CSV field per row.
+
+    Categoricals format each distinct label once and index it by code, which
+    is where most of the time in DataFrame.to_csv goes for these schemas.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        labels = np.array([_csv_label(v) for v in values.cat.categories] + [b''])
+        return labels[values.cat.codes.to_numpy()]
+    values = values.to_numpy()
+    if values.dtype == bool:
+        return np.array([b'False', b'True'])[values.astype(np.intp)]
+    if values.dtype.kind in 'iu' and len(values):
+        low, high = int(values.min()), int(values.max())
+        if high - low <= len(values):
+            return np.arange(low, high + 1).astype('S')[values - low]
+    if values.dtype.kind == 'f':
+        unique, codes = np.unique(values, return_inverse=True)
+        labels = unique.astype('S')
+        labels[np.isnan(unique)] = b''
+        return labels[codes]
+    if values.dtype.kind in 'iu':
+        return values.astype('S')
+    try:
+        encoded = values.astype(str).astype('S')
+    except UnicodeEncodeError:
+        return np.array([_csv_label(v) for v in values])
+    raw = encoded.view(np.uint8).reshape(len(values), -1)
+    if np.isin(raw, list(b',"\r\n')).any():
+        return np.array([_csv_label(v) for v in values])
+    return encoded
+
+
+def _csv_bytes(chunk):
+    """Renders a DataFrame as CSV rows (no header) matching DataFrame.to_csv output.
+
+    Fields are laid out side by side in a byte matrix padded with NULs, which
+    are then dropped, so no per-row Python work is done.
+    """
+    fields = [_csv_field(chunk[column]) for column in chunk.columns]
+    widths = [f.dtype.itemsize for f in fields]
+    matrix = np.zeros((len(chunk), sum(widths) + len(fields)), dtype=np.uint8)
+    position = 0
+    for field, width in zip(fields, widths):
+        matrix[:, position:position + width] = field.view(np.uint8).reshape(len(chunk), width)
+        matrix[:, position + width] = ord(',')
+        position += width + 1
+    matrix[:, -1] = ord('\n')
+    return matrix[matrix != 0].tobytes()
+
+
+def write_csv(schema, rows, path, seed=0, chunk_size=DEFAULT_CHUNK_SIZE, days=None, end=None):
+    """Streams generated rows to a CSV file one chunk at a time."""
+    with open(path, 'wb') as f:
+        for i, chunk in enumerate(generate(schema, rows, seed, chunk_size, days, end)):
+            if i == 0:
+                f.write(b','.join(_csv_label(c) for c in chunk.columns) + b'\n')
+            for start in range(0, len(chunk), WRITE_BLOCK_ROWS):
+                f.write(_csv_bytes(chunk.iloc[start:start + WRITE_BLOCK_ROWS]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic sales CSVs.")
+    parser.add_argument('schema', choices=sorted(GENERATORS))
+    parser.add_argument('rows', type=int)
+    parser.add_argument('output')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--days', type=int, help='length of the date range (default depends on the schema)')
+    parser.add_argument('--end', help='last possible order date, YYYY-MM-DD (default: today)')
+    args = parser.parse_args(argv)
+    write_csv(args.schema, args.rows, args.output, args.seed, args.chunk_size, args.days, args.end)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+import pytest
+
+from conversation_memory import ConversationMemory
+
+
+def test_old_turns_are_folded_into_the_summary():
+    prompts = []
+    memory = ConversationMemory(lambda prompt: prompts.append(prompt) or "summary", recent_turns=2)
+    for i in range(3):
+        memory.add_turn(f"question {i}", f"answer {i}")
+
+    assert memory.summary == "summary"
+    assert [user for user, _ in memory.turns] == ["question 1", "question 2"]
+    assert "question 0" in prompts[0] and "question 1" not in prompts[0]
+
+
+def test_failed_summary_keeps_the_turns():
+    def summarize(prompt):
+        raise RuntimeError("model unavailable")
+
+    memory = ConversationMemory(summarize, recent_turns=2)
+    memory.add_turn("question 0", "answer 0")
+    memory.add_turn("question 1", "answer 1")
+    with pytest.raises(RuntimeError):
+        memory.add_turn("question 2", "answer 2")
+
+    assert [user for user, _ in memory.turns] == ["question 0", "question 1", "question 2"]
+    assert memory.summary == ""
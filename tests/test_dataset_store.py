@@ -0,0 +1,105 @@
+import zlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import dataset_store
+from database import get_pool
+from dataset_store import DatasetStore, _decode, _encode, remember_upload
+from ingestion import BAKERY_SCHEMA
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = str(tmp_path / 'users.db')
+    pool = get_pool(path)
+    db = pool.acquire()
+    db.execute("INSERT INTO users (username, password_hash) VALUES ('alice', 'x')")
+    db.commit()
+    pool.release(db)
+    return DatasetStore(path)
+
+
+@pytest.fixture
+def sales():
+    rng = np.random.default_rng(3)
+    rows = 500
+    return pd.DataFrame({
+        'Order Date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 120, rows), unit='D'),
+        'Category': rng.choice(['Cakes', 'Tarts', 'Pastries'], rows),
+        'Product Name': pd.Categorical(rng.choice(['Brownie', 'Muffin'], rows)),
+        'Quantity Sold': rng.integers(1, 10, rows).astype('int8'),
+        'Price': rng.uniform(1, 50, rows),
+        'Discount Applied': rng.random(rows) < 0.3,
+        'Customer ID': [None if i % 50 == 0 else f'id-{i}' for i in range(rows)],
+    })
+
+
+def _sorted(df):
+    return df.sort_values(list(df.columns), key=lambda column: column.astype(str)).reset_index(drop=True)
+
+
+def test_round_trip_keeps_values_and_dtypes(store, sales, monkeypatch):
+    monkeypatch.setattr(dataset_store, 'PART_ROWS', 40)
+    store.save(1, 'bakery', sales, 'digest')
+
+    loaded = store.load(1, 'bakery')
+    assert store.info(1, 'bakery')['row_count'] == len(sales)
+    pd.testing.assert_series_equal(loaded.dtypes, sales.dtypes)
+    pd.testing.assert_frame_equal(_sorted(loaded), _sorted(sales))
+
+
+def test_filters_select_rows_and_columns(store, sales):
+    store.save(1, 'bakery', sales, 'digest')
+
+    loaded = store.load(1, 'bakery', columns=['Order Date', 'Price'], start='2024-02-01', end='2024-02-29',
+                        categories=['Tarts'])
+    expected = sales[(sales['Category'] == 'Tarts') & sales['Order Date'].between('2024-02-01', '2024-02-29')]
+    assert list(loaded.columns) == ['Order Date', 'Price']
+    assert sorted(loaded['Price']) == sorted(expected['Price'])
+
+
+def test_empty_filter_keeps_requested_schema(store, sales):
+    store.save(1, 'bakery', sales, 'digest')
+
+    empty = store.load(1, 'bakery', columns=['Category', 'Quantity Sold'], categories=['Nope'])
+    assert empty.empty
+    assert list(empty.columns) == ['Category', 'Quantity Sold']
+    assert empty.dtypes.to_dict() == sales[['Category', 'Quantity Sold']].dtypes.to_dict()
+
+
+def test_blocks_load_without_pickle(sales):
+    for name in sales.columns:
+        decoded = pd.Series(_decode(_encode(sales[name].array)), name=name)
+        pd.testing.assert_series_equal(decoded, sales[name])
+    # A pickled block is refused rather than executed.
+    import pickle
+    with pytest.raises(ValueError):
+        _decode(zlib.compress(pickle.dumps(np.array([object()], dtype=object))))
+
+
+class Upload:
+    def __init__(self, data):
+        self.data = data
+
+    def getvalue(self):
+        return self.data
+
+
+def test_remember_upload_is_best_effort(store, sales, monkeypatch):
+    monkeypatch.setattr(dataset_store, '_store', store)
+    upload = Upload(sales.to_csv(index=False).encode())
+
+    assert remember_upload(1, upload, BAKERY_SCHEMA)
+    assert store.info(1, 'bakery')['row_count'] == len(sales)
+    # No such user: the foreign key fails, and the caller only gets False.
+    assert not remember_upload(99, upload, BAKERY_SCHEMA)
+    assert store.info(99, 'bakery') is None
+
+
+def test_unstorable_column_rolls_back(store, sales):
+    mixed = sales.assign(Notes=pd.array([1, 'a'] * (len(sales) // 2), dtype=object))
+    with pytest.raises(TypeError):
+        store.save(1, 'bakery', mixed, 'digest')
+    assert store.info(1, 'bakery') is None
@@ -0,0 +1,23 @@
+import os
+
+from forecast_cache import ForecastCache
+
+
+def test_round_trip_through_disk(tmp_path):
+    cache = ForecastCache(directory=str(tmp_path))
+    cache.put('key', {'value': 1})
+    assert ForecastCache(directory=str(tmp_path)).get('key') == {'value': 1}
+
+
+def test_corrupt_entry_is_a_miss_and_removed(tmp_path):
+    (tmp_path / 'broken.pkl').write_bytes(b'not a pickle')
+    cache = ForecastCache(directory=str(tmp_path))
+    assert cache.get('broken') is None
+    assert not (tmp_path / 'broken.pkl').exists()
+
+
+def test_entry_that_fails_to_decode_is_a_miss_and_removed(tmp_path):
+    ForecastCache(directory=str(tmp_path)).put('old', {'format': 1})
+    cache = ForecastCache(directory=str(tmp_path), decode=lambda entry: entry['model'])
+    assert cache.get('old') is None
+    assert os.listdir(tmp_path) == []
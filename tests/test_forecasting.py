@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import forecasting
+from forecast_cache import ForecastCache
+
+
+class FittedModel:
+    """Stands in for a fitted Prophet model; only its params are read for warm starts."""
+
+    params = {
+        'k': np.array([[0.1]]), 'm': np.array([[0.5]]), 'sigma_obs': np.array([[0.05]]),
+        'delta': np.array([[0.0, 0.01]]), 'beta': np.array([[0.2, -0.1]]),
+    }
+
+
+@pytest.fixture
+def fit_index(tmp_path, monkeypatch):
+    index = ForecastCache(directory=str(tmp_path))
+    monkeypatch.setattr(forecasting, 'fit_index', index)
+    return index
+
+
+def _history(days, start='2024-01-01'):
+    return pd.DataFrame({'ds': pd.date_range(start, periods=days), 'y': np.arange(days, dtype=float)})
+
+
+def test_extension_within_lookback_warm_starts(fit_index):
+    forecasting._remember_fit(_history(100), 30, {}, FittedModel())
+
+    params = forecasting._previous_fit_params(_history(105), 30, {})
+    assert params['k'] == 0.1
+    np.testing.assert_array_equal(params['beta'], [0.2, -0.1])
+
+
+def test_other_series_settings_or_old_fits_do_not_warm_start(fit_index):
+    forecasting._remember_fit(_history(100), 30, {}, FittedModel())
+
+    assert forecasting._previous_fit_params(_history(105, start='2023-01-01'), 30, {}) is None
+    assert forecasting._previous_fit_params(_history(105), 30, {'daily_seasonality': False}) is None
+    assert forecasting._previous_fit_params(_history(100), 30, {}) is None
+    too_late = 100 + forecasting.INCREMENTAL_LOOKBACK_DAYS + 1
+    assert forecasting._previous_fit_params(_history(too_late), 30, {}) is None
+
+
+def test_process_pool_is_shared_until_discarded(monkeypatch):
+    monkeypatch.setattr(forecasting, '_pools', {})
+    pool = forecasting._process_pool(2)
+    assert forecasting._process_pool(2) is pool
+    assert pool._mp_context.get_start_method() in ('forkserver', 'spawn')
+
+    forecasting._discard_pool(2, pool)
+    replacement = forecasting._process_pool(2)
+    assert replacement is not pool
+    replacement.shutdown()
@@ -0,0 +1,79 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import synthetic_data
+from ingestion import BAKERY_SCHEMA, CLOTHING_SCHEMA, GIFTS_SCHEMA, compact_frame, iter_csv_chunks, parse_csv
+from kpi import (
+    BAKERY_KPI_COLUMNS, CLOTHING_KPI_COLUMNS, GIFTS_KPI_COLUMNS, KPIAccumulator, compute_kpis_chunked, _sum_by,
+)
+
+CASES = [
+    ('bakery', BAKERY_SCHEMA, BAKERY_KPI_COLUMNS),
+    ('gifts', GIFTS_SCHEMA, GIFTS_KPI_COLUMNS),
+    ('clothing', CLOTHING_SCHEMA, CLOTHING_KPI_COLUMNS),
+]
+
+
+def _csv(kind, rows=3000):
+    df = pd.concat(synthetic_data.generate(kind, rows, seed=7, end='2024-06-30'), ignore_index=True)
+    return df.to_csv(index=False).encode()
+
+
+def _assert_same(expected, actual):
+    assert expected.keys() == actual.keys()
+    for name, value in expected.items():
+        other = actual[name]
+        if isinstance(value, pd.DataFrame):
+            pd.testing.assert_frame_equal(value, other, check_index_type=False)
+        elif isinstance(value, pd.Series):
+            assert list(value.index.astype(str)) == list(other.index.astype(str)), name
+            np.testing.assert_allclose(value.to_numpy(float), other.to_numpy(float), rtol=1e-9, err_msg=name)
+        else:
+            assert value == pytest.approx(other, rel=1e-9), name
+
+
+@pytest.mark.parametrize('kind, schema, columns', CASES)
+def test_in_memory_kpis_match_groupby(kind, schema, columns):
+    df = parse_csv(_csv(kind), schema)
+    kpis = KPIAccumulator(columns).add(df).result()
+
+    revenue = df[columns['quantity']] * df[columns['price']]
+    assert kpis['total_revenue'] == pytest.approx(revenue.sum())
+    assert kpis['avg_rating'] == pytest.approx(df[columns['rating']].mean())
+    expected = revenue.groupby(df[columns['segment']]).sum()
+    np.testing.assert_allclose(kpis['segment_revenue'].to_numpy(), expected.to_numpy())
+    payments = df[columns['payment']].value_counts()
+    assert kpis['payment_counts'].to_dict() == payments.to_dict()
+
+
+@pytest.mark.parametrize('kind, schema, columns', CASES)
+def test_chunked_kpis_match_in_memory(kind, schema, columns):
+    data = _csv(kind)
+    expected = KPIAccumulator(columns).add(parse_csv(data, schema)).result()
+    chunks = iter_csv_chunks(io.BytesIO(data), schema, chunksize=700, usecols=columns.values())
+    _assert_same(expected, compute_kpis_chunked(chunks, columns))
+
+
+@pytest.mark.parametrize('kind, schema, columns', CASES)
+def test_compacted_kpis_match_in_memory(kind, schema, columns):
+    df = parse_csv(_csv(kind), schema)
+    expected = KPIAccumulator(columns).add(df).result()
+
+    compacted, report = compact_frame(df.copy(), schema)
+    assert report.after < report.before
+    assert any(isinstance(dtype, pd.CategoricalDtype) for dtype in compacted.dtypes)
+    _assert_same(expected, KPIAccumulator(columns).add(compacted).result())
+
+    # Chunks compacted separately carry different category sets.
+    chunks = [compact_frame(df.iloc[start:start + 700].copy(), schema)[0] for start in range(0, len(df), 700)]
+    _assert_same(expected, compute_kpis_chunked(chunks, columns))
+
+
+def test_sum_by_categorical_matches_plain_keys():
+    keys = pd.Series(['b', 'a', None, 'b'])
+    weights = np.array([1.0, 2.0, 4.0, 3.0])
+    categorical = keys.astype('category').cat.add_categories(['unused'])
+    pd.testing.assert_series_equal(_sum_by(keys, weights, 'k'), _sum_by(categorical, weights, 'k'))
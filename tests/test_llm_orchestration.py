@@ -0,0 +1,32 @@
+import threading
+import time
+
+import llm_orchestration
+from llm_orchestration import GenerationCancelled, run_llm_calls
+
+
+def test_results_and_errors_are_returned_by_name():
+    def fail():
+        raise ValueError("boom")
+
+    results = run_llm_calls({'ok': lambda: 1, 'bad': fail})
+    assert results['ok'] == 1
+    assert isinstance(results['bad'], ValueError)
+
+
+def test_cancelled_run_skips_calls_still_queued():
+    started = []
+    cancel_event = threading.Event()
+
+    def call(i):
+        started.append(i)
+        time.sleep(0.3)
+        return i
+
+    calls = {i: (lambda i=i: call(i)) for i in range(llm_orchestration.MAX_CONCURRENT_CALLS * 2)}
+    threading.Timer(0.1, cancel_event.set).start()
+    results = run_llm_calls(calls, cancel_event=cancel_event)
+
+    assert all(isinstance(r, GenerationCancelled) for r in results.values())
+    time.sleep(0.5)
+    assert len(started) == llm_orchestration.MAX_CONCURRENT_CALLS
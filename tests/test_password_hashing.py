@@ -0,0 +1,27 @@
+import logging
+
+from password_hashing import PasswordHasher
+
+FAST_METHOD = 'pbkdf2:sha256:1000'
+
+
+def test_hash_round_trip():
+    hasher = PasswordHasher(method=FAST_METHOD)
+    password_hash = hasher.hash('secret')
+    assert hasher.verify(password_hash, 'secret')
+    assert not hasher.verify(password_hash, 'wrong')
+    assert not hasher.needs_rehash(password_hash)
+
+
+def test_rehash_later_logs_store_failures(caplog):
+    hasher = PasswordHasher(method=FAST_METHOD, workers=1)
+
+    def store(password_hash):
+        raise RuntimeError('database is locked')
+
+    with caplog.at_level(logging.ERROR, logger='password_hashing'):
+        hasher.rehash_later('secret', store)
+        hasher._executor.shutdown(wait=True)
+
+    assert 'Could not store a rehashed password' in caplog.text
+    assert 'database is locked' in caplog.text
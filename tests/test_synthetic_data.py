@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import synthetic_data
+
+
+@pytest.mark.parametrize('kind', sorted(synthetic_data.GENERATORS))
+def test_write_csv_matches_to_csv(kind, tmp_path, monkeypatch):
+    monkeypatch.setattr(synthetic_data, 'WRITE_BLOCK_ROWS', 700)
+    path = tmp_path / 'out.csv'
+    synthetic_data.write_csv(kind, 2500, path, seed=3, chunk_size=1000, end='2024-06-30')
+    chunks = synthetic_data.generate(kind, 2500, seed=3, chunk_size=1000, end='2024-06-30')
+    expected = pd.concat(chunks, ignore_index=True).to_csv(index=False)
+    assert path.read_text() == expected
+
+
+def test_csv_bytes_quotes_and_missing_values():
+    frame = pd.DataFrame({
+        'text': ['plain', 'a, b', 'say "hi"'],
+        'label': pd.Categorical(['x, y', None, 'z']),
+        'value': [1.5, np.nan, 2.0],
+        'flag': [True, False, True],
+    })
+    assert synthetic_data._csv_bytes(frame).decode() == frame.to_csv(index=False, header=False)
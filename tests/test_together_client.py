@@ -0,0 +1,116 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from together_client import TogetherAPIError, TogetherClient
+
+
+class StubAPI:
+    """Local HTTP server that answers each POST with the next queued (status, headers, body)."""
+
+    def __init__(self, responses, delay=0.0):
+        self.responses = list(responses)
+        self.delay = delay
+        self.requests = 0
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers['Content-Length']))
+                with stub.lock:
+                    stub.requests += 1
+                    stub.active += 1
+                    stub.peak = max(stub.peak, stub.active)
+                    status, headers, body = stub.responses.pop(0) if len(stub.responses) > 1 else stub.responses[0]
+                time.sleep(stub.delay)
+                with stub.lock:
+                    stub.active -= 1
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_port}/v1'
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _reply(text):
+    return 200, {}, {'choices': [{'message': {'content': text}}]}
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(responses, delay=0.0):
+        servers.append(StubAPI(responses, delay))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+def test_retries_server_errors_then_succeeds(stub):
+    api = stub([(503, {}, {'error': 'busy'}), (429, {}, {'error': 'slow down'}), _reply('hi')])
+    client = TogetherClient('key', base_url=api.url, backoff=0.01)
+
+    assert client.chat('model', []) == 'hi'
+    assert api.requests == 3
+
+
+def test_gives_up_after_max_retries(stub):
+    api = stub([(500, {}, {'error': 'down'})])
+    client = TogetherClient('key', base_url=api.url, backoff=0.01, max_retries=2)
+
+    with pytest.raises(TogetherAPIError) as error:
+        client.chat('model', [])
+    assert error.value.status == 500
+    assert api.requests == 3
+
+
+def test_honours_retry_after(stub):
+    api = stub([(429, {'Retry-After': '1'}, {'error': 'slow down'}), _reply('ok')])
+    client = TogetherClient('key', base_url=api.url, backoff=0.01)
+
+    started = time.perf_counter()
+    assert client.chat('model', []) == 'ok'
+    assert time.perf_counter() - started >= 1
+
+
+def test_caps_concurrent_requests(stub):
+    api = stub([_reply('ok')], delay=0.2)
+    client = TogetherClient('key', base_url=api.url, max_concurrency=2)
+
+    threads = [threading.Thread(target=client.chat, args=('model', [])) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert api.requests == 6
+    assert api.peak == 2
+
+
+@pytest.mark.parametrize('body', [[1, 2], 'oops', {'choices': []}])
+def test_malformed_body_raises_client_error(stub, body):
+    api = stub([(200, {}, body)])
+    with pytest.raises(TogetherAPIError):
+        TogetherClient('key', base_url=api.url).chat('model', [])
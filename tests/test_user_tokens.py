@@ -0,0 +1,20 @@
+import pytest
+from itsdangerous import URLSafeTimedSerializer
+
+import user_tokens
+
+
+def test_round_trip_and_forgery(monkeypatch):
+    monkeypatch.setattr(user_tokens, '_serializer', URLSafeTimedSerializer('test-key', salt='streamlit-user'))
+    token = user_tokens.user_token(7)
+    assert user_tokens.user_from_token(token) == 7
+    assert user_tokens.user_from_token(token + 'x') is None
+    forged = URLSafeTimedSerializer('guessed-key', salt='streamlit-user').dumps(7)
+    assert user_tokens.user_from_token(forged) is None
+
+
+def test_without_key_pages_are_anonymous(monkeypatch):
+    monkeypatch.setattr(user_tokens, '_serializer', None)
+    assert user_tokens.user_from_token('anything') is None
+    with pytest.raises(RuntimeError):
+        user_tokens.user_token(7)
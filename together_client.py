@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+TOGETHER_API_BASE = os.environ.get('TOGETHER_API_BASE', 'https://api.together.xyz/v1')
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 120
+MAX_RETRIES = 4
+BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 30
+MAX_CONCURRENT_REQUESTS = 4
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TogetherAPIError(Exception):
+    """Raised when the Together API returns an error or an unexpected body."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class TogetherClient:
+    """Keep-alive session for the Together chat API with timeouts, retries and a concurrency cap."""
+
+    def __init__(self, api_key, base_url=TOGETHER_API_BASE, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                 max_retries=MAX_RETRIES, backoff=BACKOFF_SECONDS, max_concurrency=MAX_CONCURRENT_REQUESTS):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        })
+
+    def _retry_delay(self, attempt, response=None):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), MAX_BACKOFF_SECONDS)
+        return min(self.backoff * 2 ** attempt, MAX_BACKOFF_SECONDS)
+
+    def post(self, path, payload):
+        """POSTs JSON, retrying connection errors, 429 and 5xx with exponential backoff."""
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            try:
+                with self._slots:
+                    response = self.session.post(url, json=payload, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last_attempt:
+                    raise TogetherAPIError(f"Request to Together API failed: {e}") from e
+                time.sleep(self._retry_delay(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUSES and not last_attempt:
+                time.sleep(self._retry_delay(attempt, response))
+                continue
+
+            try:
+                body = response.json()
+            except ValueError:
+                body = None
+            if not response.ok or body is None:
+                detail = body.get("error", body) if isinstance(body, dict) else response.text[:200]
+                raise TogetherAPIError(f"Together API returned {response.status_code}: {detail}", response.status_code)
+            return body
+
+    def chat(self, model, messages, temperature=0.7, max_tokens=1024):
+        """Runs a chat completion and returns the first choice's message text."""
+        body = self.post("chat/completions", {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        })
+        try:
+            return body["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError) as e:
+            detail = body.get('error', body) if isinstance(body, dict) else body
+            raise TogetherAPIError(f"Unexpected Together API response: {str(detail)[:200]}") from e
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_together_client(api_key, base_url=TOGETHER_API_BASE):
+    """Returns the process-wide client for this key, so sessions share one connection pool."""
+    with _clients_lock:
+        client = _clients.get((api_key, base_url))
+        if client is None:
+            client = _clients[(api_key, base_url)] = TogetherClient(api_key, base_url)
+        return client
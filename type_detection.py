@@ -0,0 +1,100 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+SAMPLE_SIZE = 1000
+MIN_PARSED_FRACTION = 0.9
+MAX_CACHED_FILES = 8
+
+DATE_FORMATS = [
+    '%Y-%m-%d', '%Y/%m/%d', '%d-%m-%Y', '%d/%m/%Y', '%m/%d/%Y', '%m-%d-%Y',
+    '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%d/%m/%Y %H:%M', '%m/%d/%Y %H:%M',
+    '%d %b %Y', '%b %d, %Y', '%d %B %Y', '%B %d, %Y',
+]
+
+_detected = OrderedDict()
+_detected_lock = threading.Lock()
+
+
+def _is_text(series):
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+def _sample(series, size=SAMPLE_SIZE):
+    """Takes evenly spaced non-null values so the sample spans the whole file."""
+    values = series.dropna()
+    if len(values) <= size:
+        return values
+    return values.iloc[np.linspace(0, len(values) - 1, size).astype(int)]
+
+
+def detect_datetime_format(series):
+    """Returns (is_datetime, format) judged from a sample of the column.
+
+    The format is None when the sample only parses with pandas' own
+    inference.
+    """
+    sample = _sample(series).astype(str)
+    if sample.empty or not sample.str.contains(r'\d').all():
+        return False, None
+
+    for date_format in DATE_FORMATS:
+        parsed = pd.to_datetime(sample, format=date_format, errors='coerce')
+        if parsed.notna().mean() > MIN_PARSED_FRACTION:
+            return True, date_format
+
+    try:
+        parsed = pd.to_datetime(sample, errors='coerce', format='mixed')
+    except (ValueError, TypeError):
+        return False, None
+    return parsed.notna().mean() > MIN_PARSED_FRACTION, None
+
+
+def detect_column_types(df):
+    """Classifies columns as categorical, numeric or datetime from small samples."""
+    categorical, numeric, datetime_formats = [], [], {}
+    for column in df.columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype) or _is_text(series):
+            categorical.append(column)
+            is_datetime, date_format = detect_datetime_format(series)
+            if is_datetime:
+                datetime_formats[column] = date_format
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            numeric.append(column)
+    return {'categorical': categorical, 'numeric': numeric, 'datetime': datetime_formats}
+
+
+def _convert(df, datetime_formats):
+    converted = df.copy(deep=False)
+    for column, date_format in datetime_formats.items():
+        if date_format is None:
+            converted[column] = pd.to_datetime(converted[column], errors='coerce', format='mixed')
+        else:
+            converted[column] = pd.to_datetime(converted[column], errors='coerce', format=date_format)
+    return converted
+
+
+def typed_frame(df, cache_key):
+    """Detects column types and converts datetime columns once per file.
+
+    Returns (frame, column_types). Results are cached under `cache_key`,
+    normally the upload's content hash, so reruns skip detection and
+    conversion.
+    """
+    with _detected_lock:
+        if cache_key in _detected:
+            _detected.move_to_end(cache_key)
+            converted, column_types = _detected[cache_key]
+            return converted.copy(deep=False), column_types
+
+    column_types = detect_column_types(df)
+    converted = _convert(df, column_types['datetime'])
+
+    with _detected_lock:
+        _detected[cache_key] = (converted, column_types)
+        while len(_detected) > MAX_CACHED_FILES:
+            _detected.popitem(last=False)
+    return converted.copy(deep=False), column_types
@@ -0,0 +1,30 @@
+import os
+
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+SECRET_KEY = os.environ.get('SECRET_KEY')
+TOKEN_MAX_AGE = int(os.environ.get('USER_TOKEN_MAX_AGE', 7 * 24 * 3600))
+
+# Without a key there are no tokens: the Flask app refuses to start, and the
+# Streamlit pages run anonymously.
+_serializer = URLSafeTimedSerializer(SECRET_KEY, salt='streamlit-user') if SECRET_KEY else None
+
+
+def user_token(user_id):
+    """Signs a user id for the links from the Flask menus to the Streamlit pages."""
+    if _serializer is None:
+        raise RuntimeError('SECRET_KEY is not set; user tokens cannot be signed.')
+    return _serializer.dumps(user_id)
+
+
+def user_from_token(token, max_age=TOKEN_MAX_AGE):
+    """Returns the user id a token was signed for, or None if it is missing, forged or expired.
+
+    Always None when no SECRET_KEY is configured.
+    """
+    if not token or _serializer is None:
+        return None
+    try:
+        return int(_serializer.loads(token, max_age=max_age))
+    except (BadSignature, TypeError, ValueError):
+        return None